@@ -0,0 +1,162 @@
+import heapq
+import math
+import time
+
+import numpy as np
+
+from path_planner import MOVES, PlannerStats, PlanResult, cell_index, flat_occupancy, index_cell
+
+# Path points tested per vectorized line-of-sight batch while smoothing
+SMOOTH_BATCH = 64
+
+
+def visible_from(occupancy, origin, targets):
+    """Bool array: is each of `targets` in line of sight of `origin`?
+
+    All segments are sampled at once with integer Bresenham rounding over a
+    (targets, steps) array. Where a line steps diagonally both side cells
+    must be free too, the same no-corner-cutting rule the planners use, so
+    the check covers every cell the straight segment passes through.
+    """
+    targets = np.asarray(targets, dtype=np.int64).reshape(-1, 2)
+    if not len(targets):
+        return np.zeros(0, dtype=bool)
+    x0, y0 = int(origin[0]), int(origin[1])
+    dx = targets[:, 0] - x0
+    dy = targets[:, 1] - y0
+    steps = np.maximum(np.maximum(np.abs(dx), np.abs(dy)), 1)
+
+    # Shorter segments repeat their end cell, which is harmless for the test
+    t = np.minimum(np.arange(int(steps.max()) + 1)[None, :], steps[:, None])
+    xs = x0 + (2 * dx[:, None] * t + steps[:, None]) // (2 * steps[:, None])
+    ys = y0 + (2 * dy[:, None] * t + steps[:, None]) // (2 * steps[:, None])
+
+    blocked = occupancy[xs, ys] != 0
+    corner = occupancy[xs[:, :-1], ys[:, 1:]] | occupancy[xs[:, 1:], ys[:, :-1]]
+    diagonal = (xs[:, 1:] != xs[:, :-1]) & (ys[:, 1:] != ys[:, :-1])
+    blocked[:, 1:] |= diagonal & (corner != 0)
+    return ~blocked.any(axis=1)
+
+
+def line_of_sight(occupancy, a, b):
+    """True if the straight segment between cells `a` and `b` crosses no blocked cell."""
+    return bool(visible_from(occupancy, a, [b])[0])
+
+
+def smooth_path(occupancy, path):
+    """Reduce a grid path to the waypoints a drone actually has to turn at.
+
+    From each waypoint the path is followed for as long as its cells stay in
+    line of sight, testing SMOOTH_BATCH points per vectorized call, and the
+    last visible cell becomes the next waypoint. The result never leaves
+    free space and is never longer than the input path.
+    """
+    if path is None or len(path) < 3:
+        return path
+    cells = np.asarray(path, dtype=np.int64)
+    last = len(cells) - 1
+    waypoints = [tuple(path[0])]
+    anchor = 0
+    while anchor < last:
+        reach = anchor + 1
+        while reach < last:
+            window = cells[reach + 1:reach + 1 + SMOOTH_BATCH]
+            visible = visible_from(occupancy, cells[anchor], window)
+            if visible.all():
+                reach += len(window)
+                continue
+            reach += int(np.argmin(visible))
+            break
+        waypoints.append(tuple(path[reach]))
+        anchor = reach
+    return waypoints
+
+
+def waypoint_length(waypoints):
+    """Euclidean flight length along a waypoint list."""
+    if not waypoints:
+        return 0.0
+    points = np.asarray(waypoints, dtype=np.float64)
+    return float(np.hypot(*np.diff(points, axis=0).T).sum())
+
+
+def theta_star_search(occupancy, start, goal):
+    """Theta* any-angle search on a uniform-cost occupancy grid.
+
+    Expands like 8-connected A*, but a neighbor whose grandparent is in line
+    of sight is linked to it directly, so the returned PlanResult's `path`
+    is a list of turn waypoints and its `cost` the Euclidean flight length.
+    """
+    started = time.perf_counter()
+    width, height = occupancy.shape
+    cells = width * height
+    goal_x, goal_y = goal
+    goal_index = cell_index(goal, height)
+    start_index = cell_index(start, height)
+    blocked = memoryview(flat_occupancy(occupancy))
+    g_score = memoryview(np.full(cells, np.inf))
+    parents = memoryview(np.full(cells, -1, dtype=np.int64))
+    closed = memoryview(np.zeros(cells, dtype=np.uint8))
+
+    g_score[start_index] = 0
+    parents[start_index] = start_index
+    expanded = pushed = reopened = 0
+    peak_open = 1
+    open_list = [(math.hypot(start[0] - goal_x, start[1] - goal_y), 0.0, start_index)]
+
+    while open_list:
+        _, neg_g, index = heapq.heappop(open_list)
+        if closed[index]:
+            continue
+        closed[index] = 1
+        expanded += 1
+
+        if index == goal_index:
+            path = [index_cell(index, height)]
+            while parents[index] != index:
+                index = parents[index]
+                path.append(index_cell(index, height))
+            stats = PlannerStats(expanded, pushed, reopened, peak_open, time.perf_counter() - started)
+            return PlanResult(path[::-1], -neg_g, stats)
+
+        x, y = divmod(index, height)
+        candidates = []
+        for dx, dy, step in MOVES[8]:
+            neighbor_x, neighbor_y = x + dx, y + dy
+            if not (0 <= neighbor_x < width and 0 <= neighbor_y < height):
+                continue
+            neighbor = index + dx * height + dy
+            if blocked[neighbor] or closed[neighbor]:
+                continue
+            if dx and dy and (blocked[index + dx * height] or blocked[index + dy]):
+                continue
+            candidates.append((neighbor_x, neighbor_y, neighbor, step))
+
+        # Path 2: link straight to the parent where it can see the neighbor, one batch per expansion
+        parent = parents[index]
+        parent_x, parent_y = divmod(parent, height)
+        if parent != index and candidates:
+            sees = visible_from(occupancy, (parent_x, parent_y), [(cx, cy) for cx, cy, _, _ in candidates])
+        else:
+            sees = [False] * len(candidates)
+
+        for (neighbor_x, neighbor_y, neighbor, step), visible in zip(candidates, sees):
+            if visible:
+                via, neighbor_g = parent, g_score[parent] + math.hypot(neighbor_x - parent_x, neighbor_y - parent_y)
+            else:
+                via, neighbor_g = index, -neg_g + step
+            if not neighbor_g < g_score[neighbor]:
+                continue
+
+            if g_score[neighbor] != math.inf:
+                reopened += 1
+            g_score[neighbor] = neighbor_g
+            parents[neighbor] = via
+            neighbor_f = neighbor_g + math.hypot(neighbor_x - goal_x, neighbor_y - goal_y)
+            heapq.heappush(open_list, (neighbor_f, -neighbor_g, neighbor))
+            pushed += 1
+            if len(open_list) > peak_open:
+                peak_open = len(open_list)
+
+    stats = PlannerStats(expanded, pushed, reopened, peak_open, time.perf_counter() - started)
+    return PlanResult(None, math.inf, stats)
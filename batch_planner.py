@@ -0,0 +1,170 @@
+import math
+import os
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import shared_memory
+
+import numpy as np
+
+from path_planner import cell_index, flat_occupancy, multi_goal_search, multi_source_search, reconstruct_indices
+
+# Below this many sources the pool start-up costs more than it saves
+MIN_PARALLEL_SOURCES = 16
+
+_worker_state = None
+
+
+class SharedArray:
+    """NumPy array backed by a named shared-memory block that other processes can attach to."""
+    def __init__(self, shape, dtype, name=None):
+        dtype = np.dtype(dtype)
+        if name is None:
+            size = max(1, int(np.prod(shape)) * dtype.itemsize)
+            self.shm = shared_memory.SharedMemory(create=True, size=size)
+        else:
+            self.shm = shared_memory.SharedMemory(name=name)
+        self.array = np.ndarray(shape, dtype=dtype, buffer=self.shm.buf)
+        self.spec = (self.shm.name, tuple(shape), dtype.str)
+
+    @classmethod
+    def copy_of(cls, array):
+        shared = cls(array.shape, array.dtype)
+        shared.array[...] = array
+        return shared
+
+    @classmethod
+    def attach(cls, spec):
+        if spec is None:
+            return None
+        name, shape, dtype = spec
+        return cls(shape, dtype, name)
+
+    def release(self, unlink=False):
+        # The view must go before the block can be closed
+        self.array = None
+        self.shm.close()
+        if unlink:
+            self.shm.unlink()
+
+
+def _attach_worker(grid_spec, cost_spec, connectivity, keep_paths):
+    # Workers map the parent's blocks once; nothing grid-sized is pickled per task
+    global _worker_state
+    grid = SharedArray.attach(grid_spec)
+    _worker_state = (
+        grid,
+        SharedArray.attach(cost_spec),
+        connectivity,
+        np.empty(grid.array.size, dtype=np.int32) if keep_paths else None,
+    )
+
+
+def search_with_paths(occupancy, source, targets, connectivity, cost_map, parents):
+    """`multi_goal_search` plus, when given a scratch `parents` array, the path to each target (None if unreachable)."""
+    row = multi_goal_search(occupancy, source, targets, connectivity, cost_map, parents)
+    if parents is None:
+        return row, None
+    height = occupancy.shape[1]
+    paths = [reconstruct_indices(parents, cell_index(target, height), height) if math.isfinite(cost) else None
+             for target, cost in zip(targets, row)]
+    return row, paths
+
+
+def _search_row(task):
+    source, targets = task
+    grid, cost, connectivity, parents = _worker_state
+    return search_with_paths(grid.array, source, targets, connectivity, None if cost is None else cost.array, parents)
+
+
+def run_searches(occupancy, tasks, connectivity=4, cost_map=None, processes=None, keep_paths=False):
+    """Run one `multi_goal_search` per (source, targets) task.
+
+    Large batches are spread over a process pool. The occupancy grid and
+    cost raster live in shared memory, so workers read the map without
+    pickling it. Returns the distance rows and, with `keep_paths`, the
+    cell path to every target of every task (None where unreachable). Each
+    worker walks those paths out of one reused parent array, so memory
+    grows with the paths asked for, not with tasks times cells.
+    """
+    width, height = occupancy.shape
+    processes = processes or os.cpu_count()
+
+    if processes == 1 or len(tasks) < MIN_PARALLEL_SOURCES:
+        parents = np.empty(width * height, dtype=np.int32) if keep_paths else None
+        results = [search_with_paths(occupancy, source, targets, connectivity, cost_map, parents)
+                   for source, targets in tasks]
+    else:
+        blocks = [SharedArray.copy_of(flat_occupancy(occupancy).reshape(width, height))]
+        try:
+            if cost_map is not None:
+                blocks.append(SharedArray.copy_of(np.asarray(cost_map, dtype=np.float32)))
+            grid = blocks[0]
+            cost = blocks[1] if cost_map is not None else None
+
+            initargs = (grid.spec, cost and cost.spec, connectivity, keep_paths)
+            chunksize = max(1, len(tasks) // (8 * processes))
+            with ProcessPoolExecutor(processes, initializer=_attach_worker, initargs=initargs) as pool:
+                results = list(pool.map(_search_row, tasks, chunksize=chunksize))
+        finally:
+            for block in blocks:
+                block.release(unlink=True)
+    rows = [row for row, _ in results]
+    return rows, [paths for _, paths in results] if keep_paths else None
+
+
+class BatchResult:
+    """Distances from each source to each target, and the paths between them when they were kept."""
+    def __init__(self, sources, targets, distances, paths):
+        self.sources = sources
+        self.targets = targets
+        self.distances = distances
+        self.paths = paths
+
+    def path(self, source, target):
+        """Cell path from sources[source] to targets[target], or None if unreachable."""
+        if self.paths is None:
+            raise ValueError("Paths were not kept; run the batch with keep_paths=True")
+        return self.paths[source][target]
+
+
+def batch_shortest_paths(occupancy, sources, targets, connectivity=4, cost_map=None, processes=None, keep_paths=False):
+    """Many-to-many shortest paths with a single search per source.
+
+    Returns a BatchResult whose `distances` is a (sources, targets) matrix.
+    With `keep_paths`, `path(i, j)` also returns the route; only the
+    source-to-target paths are kept, never a search tree per source.
+    """
+    sources = [tuple(source) for source in sources]
+    targets = [tuple(target) for target in targets]
+    rows, paths = run_searches(occupancy, [(source, targets) for source in sources],
+                               connectivity, cost_map, processes, keep_paths)
+    distances = np.array(rows, dtype=np.float64).reshape(len(sources), len(targets))
+    return BatchResult(sources, targets, distances, paths)
+
+
+class NearestResult:
+    """For each target, the cost from its nearest source and the path from it on request."""
+    def __init__(self, sources, targets, distances, parents, height):
+        self.sources = sources
+        self.targets = targets
+        self.distances = distances
+        self.parents = parents
+        self.height = height
+
+    def path(self, target):
+        if not math.isfinite(self.distances[target]):
+            return None
+        return reconstruct_indices(self.parents, cell_index(self.targets[target], self.height), self.height)
+
+    def source_of(self, target):
+        """Index into `sources` of the source that serves `target`, or None."""
+        path = self.path(target)
+        return None if path is None else self.sources.index(path[0])
+
+
+def nearest_sources(occupancy, sources, targets, connectivity=4, cost_map=None):
+    """Match every target to its closest source with one multi-source search."""
+    sources = [tuple(source) for source in sources]
+    targets = [tuple(target) for target in targets]
+    parents = np.empty(occupancy.size, dtype=np.int32)
+    distances = multi_source_search(occupancy, sources, targets, connectivity, cost_map, parents)
+    return NearestResult(sources, targets, np.array(distances), parents, occupancy.shape[1])
@@ -0,0 +1,59 @@
+import sys
+
+import cv2
+from ultralytics import YOLO
+
+from video_pipeline import FramePipeline
+
+MODEL_PATH = "final_jawaan_final_120.pt"
+BATCH_SIZES = [None, 8, 16, 32]
+FRAME_SIZE = (960, 540)
+
+
+def read_frames(video_path, max_frames):
+    """Decode up to `max_frames` resized frames so every run infers the same input."""
+    capture = cv2.VideoCapture(video_path)
+    frames = []
+    while len(frames) < max_frames:
+        success, frame = capture.read()
+        if not success:
+            break
+        frames.append(cv2.resize(frame, FRAME_SIZE))
+    capture.release()
+    return frames
+
+
+def run_batch_benchmark(video_path, model_path=MODEL_PATH, batch_sizes=BATCH_SIZES, max_frames=256):
+    """Offline pipeline throughput per predict batch size, decoding kept out of the timing."""
+    frames = read_frames(video_path, max_frames)
+    if not frames:
+        raise ValueError(f"Could not read any frames from {video_path}")
+    model = YOLO(model_path)
+    model.predict(frames[:1], verbose=False)  # Warm-up: model fusing and first-call allocation
+
+    print(f"{'batch':>6} {'frames':>7} {'predicts':>9} {'infer s':>9} {'total s':>9} {'fps':>8}")
+    for batch_size in batch_sizes:
+        source = iter(frames)
+
+        def capture():
+            frame = next(source, None)
+            return frame is not None, frame
+
+        if batch_size is None:
+            def infer(frame):
+                return model.predict(frame, verbose=False)[0]
+        else:
+            def infer(batch):
+                return model.predict(batch, verbose=False)
+
+        published = []
+        stats = FramePipeline(capture, infer, lambda result: result, published.append, batch_size=batch_size).run()
+        label = batch_size or 1
+        print(f"{label:>6} {stats.published:>7} {stats.batches:>9} {stats.busy['infer']:>9.3f} "
+              f"{stats.wall_time:>9.3f} {stats.fps:>8.1f}")
+
+
+if __name__ == "__main__":
+    if len(sys.argv) < 2:
+        sys.exit("usage: python benchmark_detection.py VIDEO [MODEL]")
+    run_batch_benchmark(sys.argv[1], *sys.argv[2:3])
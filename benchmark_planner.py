@@ -0,0 +1,145 @@
+import time
+
+import numpy as np
+
+from any_angle import smooth_path, theta_star_search, waypoint_length
+from coverage_planner import distance_matrix, plan_coverage
+from hierarchical_planner import HierarchicalPlanner
+from landmarks import LandmarkHeuristic
+from path_planner import plan_path
+
+GRID_SIDES = [100, 1000, 4000]
+PLANNERS = [("astar", 4), ("bidirectional", 4), ("jps", 4), ("astar", 8), ("bidirectional", 8), ("jps", 8)]
+
+
+def fence_obstacles(side):
+    """Occupancy grid with four fences whose gaps are staggered either side of the middle."""
+    occupancy = np.zeros((side, side), dtype=np.uint8)
+    for k in range(1, 5):
+        x = k * side // 5
+        low = 3 * side // 10 if k % 2 else 6 * side // 10
+        occupancy[x, :] = 1
+        occupancy[x, low:low + side // 10] = 0
+    return occupancy
+
+
+def run_benchmark(sides=GRID_SIDES, planners=PLANNERS):
+    print(f"{'grid':>11} {'planner':>15} {'path':>8} {'expanded':>10} {'seconds':>9}")
+    for side in sides:
+        occupancy = fence_obstacles(side)
+        start = (0, side // 2)
+        goal = (side - 1, side // 2)
+
+        for mode, connectivity in planners:
+            started = time.perf_counter()
+            result = plan_path(occupancy, start, goal, mode, connectivity)
+            elapsed = time.perf_counter() - started
+
+            path_len = len(result.path) if result.path else 0
+            planner = f"{mode}/{connectivity}"
+            print(f"{side:>5}x{side:<5} {planner:>15} {path_len:>8} {result.expanded:>10} {elapsed:>9.3f}")
+
+
+def run_equivalence_check(trials=300, side=24, seed=0):
+    """Plan random routes with every planner and report any cost that differs from astar.
+
+    Every fourth trial blocks the goal cell, which must give no path in all modes.
+    """
+    rng = np.random.default_rng(seed)
+    mismatches = 0
+    for trial in range(trials):
+        occupancy = (rng.random((side, side)) < rng.uniform(0.0, 0.4)).astype(np.uint8)
+        start, goal = [tuple(int(v) for v in rng.integers(0, side, 2)) for _ in range(2)]
+        occupancy[start] = 0
+        occupancy[goal] = 1 if trial % 4 == 0 and start != goal else 0
+        expected = {connectivity: plan_path(occupancy, start, goal, "astar", connectivity).cost for connectivity in (4, 8)}
+        for mode, connectivity in PLANNERS:
+            cost = plan_path(occupancy, start, goal, mode, connectivity).cost
+            if not (cost == expected[connectivity] or abs(cost - expected[connectivity]) < 1e-3):
+                mismatches += 1
+                print(f"trial {trial}: {mode}/{connectivity} cost {cost} != astar {expected[connectivity]} "
+                      f"from {start} to {goal}")
+    print(f"{trials} grids, {mismatches} mismatches")
+    return mismatches
+
+
+def run_hierarchical_benchmark(sides=GRID_SIDES, cluster_size=32):
+    print(f"{'grid':>11} {'abstract':>9} {'build s':>9} {'path':>8} {'expanded':>10} {'query s':>9}")
+    for side in sides:
+        occupancy = fence_obstacles(side)
+
+        started = time.perf_counter()
+        planner = HierarchicalPlanner(occupancy, cluster_size)
+        build = time.perf_counter() - started
+
+        started = time.perf_counter()
+        result = planner.plan((0, side // 2), (side - 1, side // 2))
+        query = time.perf_counter() - started
+
+        path_len = len(result.path) if result.path else 0
+        print(f"{side:>5}x{side:<5} {len(planner.nodes):>9} {build:>9.3f} {path_len:>8} {result.expanded:>10} {query:>9.3f}")
+
+
+def run_landmark_benchmark(sides=GRID_SIDES[:2], count=8):
+    print(f"{'grid':>11} {'heuristic':>9} {'build s':>9} {'path':>8} {'expanded':>10} {'query s':>9}")
+    for side in sides:
+        occupancy = fence_obstacles(side)
+
+        started = time.perf_counter()
+        landmarks = LandmarkHeuristic.build(occupancy, count)
+        build = time.perf_counter() - started
+
+        for name, option in (("manhattan", None), ("alt", landmarks)):
+            result = plan_path(occupancy, (0, side // 2), (side - 1, side // 2), landmarks=option)
+            path_len = len(result.path) if result.path else 0
+            build_s = build if option is not None else 0.0
+            print(f"{side:>5}x{side:<5} {name:>9} {build_s:>9.3f} {path_len:>8} {result.expanded:>10} "
+                  f"{result.stats.wall_time:>9.3f}")
+
+
+def run_any_angle_benchmark(sides=(100, 300)):
+    print(f"{'grid':>11} {'route':>13} {'waypoints':>9} {'length':>9} {'seconds':>9}")
+    for side in sides:
+        occupancy = fence_obstacles(side)
+        start, goal = (0, side // 2), (side - 1, side // 2)
+
+        grid = plan_path(occupancy, start, goal)
+        started = time.perf_counter()
+        smoothed = smooth_path(occupancy, grid.path)
+        smooth_s = time.perf_counter() - started
+        theta = theta_star_search(occupancy, start, goal)
+
+        for name, waypoints, seconds in (("astar/4", grid.path, grid.stats.wall_time),
+                                         ("astar/4+los", smoothed, grid.stats.wall_time + smooth_s),
+                                         ("theta*", theta.path, theta.stats.wall_time)):
+            print(f"{side:>5}x{side:<5} {name:>13} {len(waypoints):>9} {waypoint_length(waypoints):>9.1f} {seconds:>9.3f}")
+
+
+def run_coverage_benchmark(side=300, waypoint_counts=(50, 100, 300), drones=4, seed=0):
+    occupancy = fence_obstacles(side)
+    free_cells = np.argwhere(occupancy == 0)
+    rng = np.random.default_rng(seed)
+    depot = (0, side // 2)
+
+    print(f"{'waypoints':>9} {'drones':>6} {'matrix s':>9} {'total s':>9} {'makespan':>9}")
+    for count in waypoint_counts:
+        waypoints = [tuple(cell) for cell in free_cells[rng.choice(len(free_cells), count, replace=False)]]
+
+        started = time.perf_counter()
+        distance_matrix(occupancy, [depot] + waypoints)
+        matrix_time = time.perf_counter() - started
+
+        # The second call reuses the cached matrix, so this times only the routing
+        started = time.perf_counter()
+        plan = plan_coverage(occupancy, depot, waypoints, drones)
+        total = matrix_time + time.perf_counter() - started
+        print(f"{count:>9} {drones:>6} {matrix_time:>9.3f} {total:>9.3f} {plan.makespan:>9.1f}")
+
+
+if __name__ == "__main__":
+    run_equivalence_check()
+    run_benchmark()
+    run_hierarchical_benchmark()
+    run_landmark_benchmark()
+    run_any_angle_benchmark()
+    run_coverage_benchmark()
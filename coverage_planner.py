@@ -0,0 +1,227 @@
+import math
+from collections import OrderedDict
+
+import numpy as np
+
+from batch_planner import run_searches
+from path_planner import grid_fingerprint, plan_path
+
+# Matrices for the most recent (map version, waypoint set) combinations
+MATRIX_CACHE_SIZE = 32
+
+_matrix_cache = OrderedDict()
+
+
+def distance_matrix(occupancy, waypoints, connectivity=4, processes=None):
+    """Shortest-path distances between every pair of waypoints on the grid.
+
+    Rows are computed with one multi-goal search per source, fanned out over
+    a shared-memory process pool for larger waypoint sets. Results are cached
+    per map version, so replanning the same waypoints on an unchanged map is
+    free.
+    """
+    waypoints = [tuple(int(v) for v in waypoint) for waypoint in waypoints]
+    key = (grid_fingerprint(occupancy), connectivity, tuple(waypoints))
+    if key in _matrix_cache:
+        _matrix_cache.move_to_end(key)
+        return _matrix_cache[key]
+
+    # Grid distances are symmetric, so row i only needs the waypoints after i
+    tasks = [(waypoint, waypoints[i + 1:]) for i, waypoint in enumerate(waypoints[:-1])]
+    rows, _ = run_searches(occupancy, tasks, connectivity, processes=processes)
+
+    matrix = np.zeros((len(waypoints), len(waypoints)))
+    for i, row in enumerate(rows):
+        matrix[i, i + 1:] = row
+        matrix[i + 1:, i] = row
+
+    _matrix_cache[key] = matrix
+    if len(_matrix_cache) > MATRIX_CACHE_SIZE:
+        _matrix_cache.popitem(last=False)
+    return matrix
+
+
+def tour_length(matrix, tour):
+    """Length of the closed tour visiting `tour` in order."""
+    tour = np.asarray(tour)
+    return float(matrix[tour, np.roll(tour, -1)].sum())
+
+
+def nearest_neighbor_tour(matrix, start=0):
+    """Greedy closed tour from `start` that always visits the closest unvisited node."""
+    unvisited = np.ones(len(matrix), dtype=bool)
+    unvisited[start] = False
+    tour = [start]
+    for _ in range(len(matrix) - 1):
+        candidates = np.where(unvisited, matrix[tour[-1]], np.inf)
+        nearest = int(np.argmin(candidates))
+        unvisited[nearest] = False
+        tour.append(nearest)
+    return tour
+
+
+def two_opt(matrix, tour):
+    """Improve a closed tour with 2-opt moves until none helps.
+
+    For each first edge the gains of every second edge are evaluated in one
+    vectorized step, so a pass costs O(n) NumPy operations.
+    """
+    tour = np.array(tour)
+    n = len(tour)
+    improved = n > 3
+    while improved:
+        improved = False
+        for i in range(n - 2):
+            a, b = tour[i], tour[i + 1]
+            c = tour[i + 2:]
+            d = np.roll(tour, -1)[i + 2:]
+            gains = matrix[a, b] + matrix[c, d] - matrix[a, c] - matrix[b, d]
+            if i == 0:
+                gains[-1] = 0  # edges (0, 1) and (n - 1, 0) share node 0
+            j = int(np.argmax(gains))
+            if gains[j] > 1e-9:
+                tour[i + 1:i + 3 + j] = tour[i + 1:i + 3 + j][::-1]
+                improved = True
+    return tour.tolist()
+
+
+def or_opt(matrix, tour, max_segment=3):
+    """Move runs of up to `max_segment` nodes (optionally reversed) to a better place in the tour.
+
+    Position 0 stays fixed so tours keep starting at the depot.
+    """
+    tour = list(tour)
+    n = len(tour)
+    improved = True
+    while improved:
+        improved = False
+        for length in range(1, max_segment + 1):
+            for i in range(1, n - length + 1):
+                if n - length < 3:
+                    break
+                segment = tour[i:i + length]
+                before, after = tour[i - 1], tour[(i + length) % n]
+                first, last = segment[0], segment[-1]
+                removal_gain = matrix[before, first] + matrix[last, after] - matrix[before, after]
+
+                rest = np.array(tour[:i] + tour[i + length:])
+                nxt = np.roll(rest, -1)
+                forward = matrix[rest, first] + matrix[last, nxt] - matrix[rest, nxt]
+                backward = matrix[rest, last] + matrix[first, nxt] - matrix[rest, nxt]
+                # Re-inserting between `before` and `after` is the current tour
+                forward[i - 1] = backward[i - 1] = np.inf
+                k_forward, k_backward = int(np.argmin(forward)), int(np.argmin(backward))
+
+                if forward[k_forward] <= backward[k_backward]:
+                    k, cost, insert = k_forward, forward[k_forward], segment
+                else:
+                    k, cost, insert = k_backward, backward[k_backward], segment[::-1]
+                if removal_gain - cost > 1e-9:
+                    rest = rest.tolist()
+                    tour = rest[:k + 1] + insert + rest[k + 1:]
+                    improved = True
+    return tour
+
+
+def improve_tour(matrix, tour):
+    """2-opt and Or-opt alternately until neither finds an improvement."""
+    best = tour_length(matrix, tour)
+    while True:
+        tour = or_opt(matrix, two_opt(matrix, tour))
+        length = tour_length(matrix, tour)
+        if length >= best - 1e-9:
+            return tour
+        best = length
+
+
+def split_tour(matrix, tour, routes):
+    """Cut a depot-first giant tour into at most `routes` depot-to-depot routes with the smallest longest route."""
+    stops = np.array(tour[1:])
+    depot = tour[0]
+    if len(stops) == 0:
+        return [[] for _ in range(routes)]
+
+    # cost[i, j]: route depot -> stops[i..j] -> depot, from prefix sums of the legs
+    legs = np.concatenate(([0.0], np.cumsum(matrix[stops[:-1], stops[1:]])))
+    out, back = matrix[depot, stops], matrix[stops, depot]
+    cost = out[:, None] + (legs[None, :] - legs[:, None]) + back[None, :]
+    cost = np.where(np.triu(np.ones_like(cost, dtype=bool)), cost, np.inf)
+
+    def greedy_cut(limit):
+        # Extending a route never makes it cheaper (triangle inequality), so greedy cuts are optimal
+        cuts, i = [], 0
+        while i < len(stops):
+            j = i
+            while j + 1 < len(stops) and cost[i, j + 1] <= limit:
+                j += 1
+            if cost[i, j] > limit:
+                return None
+            cuts.append((i, j))
+            i = j + 1
+        return cuts if len(cuts) <= routes else None
+
+    candidates = np.unique(cost[np.isfinite(cost)])
+    low, high = 0, len(candidates) - 1
+    while low < high:
+        middle = (low + high) // 2
+        if greedy_cut(candidates[middle]) is None:
+            low = middle + 1
+        else:
+            high = middle
+    cuts = greedy_cut(candidates[low])
+    split = [stops[i:j + 1].tolist() for i, j in cuts]
+    return split + [[] for _ in range(routes - len(split))]
+
+
+class CoveragePlan:
+    """Depot-to-depot routes for each drone, as waypoint cells."""
+    def __init__(self, depot, routes, lengths, unreachable):
+        self.depot = depot
+        self.routes = routes
+        self.lengths = lengths
+        self.unreachable = unreachable
+
+    @property
+    def makespan(self):
+        return max(self.lengths, default=0.0)
+
+    @property
+    def total_length(self):
+        return sum(self.lengths)
+
+    def route_path(self, occupancy, drone, connectivity=4):
+        """Full grid path flown by `drone`, planned leg by leg."""
+        stops = [self.depot] + self.routes[drone] + [self.depot]
+        path = [self.depot]
+        for a, b in zip(stops, stops[1:]):
+            path.extend(plan_path(occupancy, a, b, connectivity=connectivity).path[1:])
+        return path
+
+    def __repr__(self):
+        return (f"CoveragePlan(drones={len(self.routes)}, makespan={self.makespan:.1f}, "
+                f"total={self.total_length:.1f}, unreachable={len(self.unreachable)})")
+
+
+def plan_coverage(occupancy, depot, waypoints, drones, connectivity=4, processes=None):
+    """Split `waypoints` between `drones` launched from and returning to `depot`.
+
+    A nearest-neighbor giant tour is polished with 2-opt and Or-opt, cut into
+    routes that minimise the longest flight, and each route is polished again.
+    Waypoints that cannot be reached from the depot are reported, not routed.
+    """
+    depot = tuple(depot)
+    cells = [depot] + [tuple(waypoint) for waypoint in waypoints]
+    matrix = distance_matrix(occupancy, cells, connectivity, processes)
+
+    reachable = [i for i in range(1, len(cells)) if math.isfinite(matrix[0, i])]
+    unreachable = [cells[i] for i in range(1, len(cells)) if not math.isfinite(matrix[0, i])]
+    nodes = np.array([0] + reachable)
+    sub = matrix[np.ix_(nodes, nodes)]
+
+    giant = improve_tour(sub, nearest_neighbor_tour(sub))
+    routes, lengths = [], []
+    for stops in split_tour(sub, giant, drones):
+        tour = improve_tour(sub, [0] + stops) if stops else [0]
+        lengths.append(tour_length(sub, tour) if stops else 0.0)
+        routes.append([cells[nodes[i]] for i in tour[1:]])
+    return CoveragePlan(depot, routes, lengths, unreachable)
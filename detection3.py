@@ -5,6 +5,8 @@ import smtplib
 from email.mime.text import MIMEText
 from email.mime.multipart import MIMEMultipart
 
+from motion_gate import MotionGate
+
 # Function to send an emergency alert
 """def send_alert():
     sender_email = "your_email@example.com"
@@ -43,9 +45,14 @@ def rgb_to_magma(image):
     return magma_image
 
 # Object detection
-def detect_objects(frame, model):
-    results = model(frame)
-    detections = results[0].boxes.data.cpu().numpy()
+def find_objects(frame, model):
+    """Run the model and return its detections as (x1, y1, x2, y2, confidence, class_id) rows."""
+    return model(frame)[0].boxes.data.cpu().numpy()
+
+def detect_objects(frame, model, detections=None):
+    """Draw detections on the frame, running the model unless earlier `detections` are carried forward."""
+    if detections is None:
+        detections = find_objects(frame, model)
 
     # Define the labels based on the given format
     labels_map = {
@@ -92,31 +99,38 @@ def main():
     screen_width = 1920  # Set your screen width
     screen_height = 1080  # Set your screen height
 
+    # Only frames that changed since the last detection go through the model
+    motion_gate = MotionGate()
+    detections = None
+
+    # The 2x2 grid is allocated once; every tile is resized straight into its quarter
+    grid_width = screen_width // 2
+    grid_height = screen_height // 2
+    tile_size = (grid_width, grid_height)
+    combined_frame = np.empty((2 * grid_height, 2 * grid_width, 3), dtype=np.uint8)
+    original_tile = combined_frame[:grid_height, :grid_width]
+    thermal_tile = combined_frame[:grid_height, grid_width:]
+    detection_tile = combined_frame[grid_height:, :grid_width]
+    magma_tile = combined_frame[grid_height:, grid_width:]
+    gray_tile = np.empty((grid_height, grid_width), dtype=np.uint8)
+
     while cap.isOpened():
         ret, frame = cap.read()
         if not ret:
             break
 
-        # Thermal and magma mapping
-        thermal_frame = rgb_to_thermal(frame)
-        magma_frame = rgb_to_magma(frame)
-
-        # Perform object detection
-        detection_frame = detect_objects(frame.copy(), model)
-
-        # Resize frames for 2x2 grid
-        grid_width = screen_width // 2
-        grid_height = screen_height // 2
+        # Perform object detection, keeping the previous boxes while the scene is still
+        if motion_gate.check(frame):
+            detections = find_objects(frame, model)
+        detection_frame = detect_objects(frame.copy(), model, detections)
 
-        thermal_frame = cv2.resize(thermal_frame, (grid_width, grid_height))
-        magma_frame = cv2.resize(magma_frame, (grid_width, grid_height))
-        detection_frame = cv2.resize(detection_frame, (grid_width, grid_height))
-        original_frame = cv2.resize(frame, (grid_width, grid_height))
+        cv2.resize(frame, tile_size, dst=original_tile)
+        cv2.resize(detection_frame, tile_size, dst=detection_tile)
 
-        # Combine frames into a 2x2 grid
-        top_row = np.hstack((original_frame, thermal_frame))
-        bottom_row = np.hstack((detection_frame, magma_frame))
-        combined_frame = np.vstack((top_row, bottom_row))
+        # Thermal and magma mapping on the small tile: one grayscale conversion for both colour maps
+        cv2.cvtColor(original_tile, cv2.COLOR_BGR2GRAY, dst=gray_tile)
+        cv2.applyColorMap(gray_tile, cv2.COLORMAP_JET, dst=thermal_tile)
+        cv2.applyColorMap(gray_tile, cv2.COLORMAP_MAGMA, dst=magma_tile)
 
         # Display the combined frame in full-screen
         cv2.namedWindow("Border Monitoring", cv2.WINDOW_NORMAL)
@@ -128,6 +142,7 @@ def main():
 
     cap.release()
     cv2.destroyAllWindows()
+    print(f"Detector ran on {motion_gate.triggered} of {motion_gate.frames} frames")
 
 if __name__ == "__main__":
     main()
@@ -0,0 +1,484 @@
+import base64
+import copy
+import os
+import tempfile
+from collections import deque
+from threading import Event, Lock, Thread
+
+import cv2
+import dash
+import dash_bootstrap_components as dbc
+from dash import html, Input, Output, State
+from flask import Response, abort, request
+from ultralytics import YOLO
+
+from detector_process import start_detector
+from frame_hub import BOUNDARY, FrameHub
+from motion_gate import MotionGate
+from path_cache import PathCache
+from path_planner import Node, occupancy_grid
+from path_render import PathRenderer
+from stream_manager import StreamManager
+from tracker import Tracker
+from video_pipeline import FramePipeline
+
+MODEL_PATH = "final_jawaan_final_120.pt"
+FRAME_SIZE = (960, 540)
+OFFLINE_BATCH_SIZE = 16  # Frames per predict call for uploaded files
+CHUNK_FRAMES = 10  # Frames per unauthorized count
+COUNT_HISTORY = 1000  # Counts kept per source; older ones are dropped
+
+# Newest encoded frame of each view; browsers get them pushed over MJPEG unless JAWAAN_FRAME_PUSH=0
+FRAME_CHANNELS = ("detection", "thermal", "magma")
+FALSE_COLOUR_MAPS = (("thermal", cv2.COLORMAP_JET), ("magma", cv2.COLORMAP_MAGMA))
+PUSH_FRAMES = os.environ.get("JAWAAN_FRAME_PUSH", "1") == "1"
+STREAM_FPS = 15  # Default per-client frame rate cap
+
+# With JAWAAN_DETECTOR_PROCESS=1 capture and YOLO run in a child process that hands frames over in shared memory
+USE_DETECTOR_PROCESS = os.environ.get("JAWAAN_DETECTOR_PROCESS") == "1"
+
+# Post cameras, as comma-separated webcam indices, files or RTSP URLs: JAWAAN_CAMERAS="0,1,rtsp://10.0.0.5/live"
+CAMERA_SOURCES = [source.strip() for source in os.environ.get("JAWAAN_CAMERAS", "").split(",") if source.strip()]
+
+# Patrol plots by URL name: (obstacles, title), all planned on one small grid
+PLOT_GRID_SIZE = (10, 10)
+PLOT_START = Node(0, 0)
+PLOT_GOAL = Node(7, 7)
+PATH_PLOTS = {
+    "with-obstacles": ({(3, 3), (3, 4), (3, 5), (4, 5), (5, 5)}, "Path With Obstacles"),
+    "without-obstacles": (set(), "Path Without Obstacles"),
+}
+
+# One reused figure, with PNGs cached per map and path
+path_renderer = PathRenderer()
+# Patrol legs are served from a cache that survives restarts
+path_cache = PathCache(db_path="path_cache.sqlite")
+
+
+def path_plot_png(name):
+    """PNG of a patrol plot; the planned path and the rendered image are both cached after the first request."""
+    plot_obstacles, title = PATH_PLOTS[name]
+    occupancy = occupancy_grid(plot_obstacles, PLOT_GRID_SIZE)
+    path = path_cache.plan(occupancy, (PLOT_START.x, PLOT_START.y), (PLOT_GOAL.x, PLOT_GOAL.y)).path
+    return path_renderer.render(occupancy, path, title)
+
+
+def carry_forward(result, frame):
+    """The previous detections attached to a new frame, so the annotated view keeps its boxes."""
+    carried = copy.copy(result)
+    carried.orig_img = frame
+    return carried
+
+
+def track_intruders(result, tracker):
+    """Feed a tracker one detector frame; returns the ids of confirmed unauthorized tracks in it."""
+    boxes = result.boxes
+    ids, _, classes = tracker.update(boxes.xyxy.cpu().numpy(), boxes.cls.cpu().numpy())
+    return {track_id for track_id, class_id in zip(ids.tolist(), classes.tolist())
+            if result.names[class_id] == "Unauthorized"}
+
+
+def load_detector():
+    """Inference for one worker of the camera pool; every worker loads its own model."""
+    model = YOLO(MODEL_PATH)
+    return lambda frames: model.predict(frames, verbose=False)
+
+
+def stream_source(channel):
+    return f"/stream/{channel}.mjpg" if PUSH_FRAMES else None
+
+
+def serving_process(debug):
+    """False in the debug reloader's parent, which only watches files and restarts the child that serves."""
+    return not debug or os.environ.get("WERKZEUG_RUN_MAIN") == "true"
+
+
+def false_colour_toggle():
+    """Switches for the thermal and magma views, both off until the operator wants them."""
+    return dbc.Checklist(
+        id='false-colour-views',
+        options=[{"label": channel.capitalize(), "value": channel} for channel, _ in FALSE_COLOUR_MAPS],
+        value=[], inline=True, switch=True,
+    )
+
+
+class DetectionService:
+    """The vigilance views shared by both dashboards: uploaded or webcam video, post cameras and patrol plots.
+
+    One instance owns the detector, the processing thread, the camera pool
+    and the frame hub the views are served from. `register(app)` adds the
+    Flask routes and the Dash callbacks for the components below, so a
+    dashboard only has to lay them out under the same ids: upload-video,
+    video-display, start-processing, stop-processing, toggle-webcam,
+    live-detection, thermal-frame, magma-frame, false-colour-views,
+    unauthorized-alert, interval-component, frame-versions, camera-grid and
+    dummy-div. The thermal and magma images start without a source and only
+    get one while switched on in false-colour-views; a view nobody has
+    switched on is neither streamed nor built.
+    """
+    def __init__(self):
+        self.model = YOLO(MODEL_PATH)
+        self.frame_hub = FrameHub()
+        self.video_capture = None
+        self.video_file_path = None
+        self.use_webcam = False
+        self.stop_event = Event()
+        self.processing_thread = None
+        self.processing_started = False
+        self.unauthorized_detected = False
+        # Per source ("video" or a camera name), the distinct unauthorized persons tracked in every 10 frames
+        self.unauthorized_counts = {}
+
+        # Inference runs on one thread, in frame order, so these counters need no lock
+        self.frame_count = 0
+        self.chunk_intruders = set()  # Unauthorized track ids seen in the current 10-frame chunk
+        self.current_intruders = set()  # Unauthorized track ids in the latest detector frame
+        # Boxes become identities, so someone standing still is counted once, not once per frame
+        self.tracker = Tracker()
+        # Quiet frames reuse the last detections instead of running YOLO again
+        self.motion_gate = MotionGate()
+        self.last_result = None
+
+        self.frame_ring = None
+        self.ring_sequence = -1
+        self.ring_chunk = 0
+        self.ring_total = 0
+        self.ring_lock = Lock()
+
+        # All cameras share one worker pool, batched round-robin across streams
+        self.camera_manager = StreamManager(load_detector, self.finish_camera,
+                                            workers=max(1, (os.cpu_count() or 2) // 2),
+                                            prepare=lambda frame: cv2.resize(frame, FRAME_SIZE),
+                                            gate_factory=MotionGate)
+
+    def record_count(self, source, count):
+        """Keep one chunk's unauthorized count for `source`, dropping its oldest beyond COUNT_HISTORY."""
+        counts = self.unauthorized_counts.get(source)
+        if counts is None:
+            counts = self.unauthorized_counts.setdefault(source, deque(maxlen=COUNT_HISTORY))
+        counts.append(count)
+
+    def release_video(self):
+        if self.video_capture:
+            self.video_capture.release()
+            self.video_capture = None
+
+    def detect_frames(self, frames):
+        """Inference stage: resize the frames, run YOLO once on those that changed and keep the unauthorized counts."""
+        frames_resized = [cv2.resize(frame, FRAME_SIZE) for frame in frames]
+        changed = [self.motion_gate.check(frame) for frame in frames_resized]
+        fresh = [frame for frame, moved in zip(frames_resized, changed) if moved]
+        predicted = iter(self.model.predict(fresh) if fresh else ())
+        results = []
+        for frame, moved in zip(frames_resized, changed):
+            if moved:
+                self.last_result = next(predicted)
+                self.current_intruders = track_intruders(self.last_result, self.tracker)
+            else:
+                self.last_result = carry_forward(self.last_result, frame)
+            results.append(self.last_result)
+
+            self.frame_count += 1
+            self.chunk_intruders |= self.current_intruders
+            if self.current_intruders:
+                self.unauthorized_detected = True
+
+            # Every 10 frames, record how many different intruders were seen and reset
+            if self.frame_count % CHUNK_FRAMES == 0:
+                self.record_count("video", len(self.chunk_intruders))
+                self.chunk_intruders = set()
+        return list(zip(frames_resized, results))
+
+    def detect_frame(self, frame):
+        return self.detect_frames([frame])[0]
+
+    def finish_camera(self, stream, frame, result):
+        """Track one camera frame and return it annotated as JPEG bytes; `result` is None when the gate skipped it.
+
+        Each camera keeps its own 10-frame chunk and records its counts
+        under its own name, as the main video does under "video". The manager never
+        hands one stream to two workers at once, so the state needs no lock.
+        """
+        state = stream.state
+        if result is None:
+            result = carry_forward(state["result"], frame)
+        else:
+            state["intruders"] = track_intruders(result, state.setdefault("tracker", Tracker()))
+        state["result"] = result
+
+        intruders = state.get("intruders", set())
+        chunk = state.setdefault("chunk", set())
+        chunk |= intruders
+        if intruders:
+            self.unauthorized_detected = True
+        state["frames"] = state.get("frames", 0) + 1
+        if state["frames"] % CHUNK_FRAMES == 0:
+            self.record_count(stream.name, len(chunk))
+            state["chunk"] = set()
+        return cv2.imencode('.jpg', result.plot())[1].tobytes()
+
+    def start_cameras(self, sources=CAMERA_SOURCES):
+        for number, source in enumerate(sources):
+            self.camera_manager.add_stream(f"camera-{number}", int(source) if source.isdigit() else source)
+        self.camera_manager.start()
+
+    def false_colour_source(self, frame):
+        """Grayscale copy of the frame for the false-colour views, or None when nobody is watching either."""
+        if any(self.frame_hub.watched(channel) for channel, _ in FALSE_COLOUR_MAPS):
+            return cv2.cvtColor(frame, cv2.COLOR_RGB2GRAY)
+        return None
+
+    def false_colour_views(self, gray_frame):
+        """JPEG bytes of the thermal and magma views; None for each view nobody is watching."""
+        return tuple(cv2.imencode('.jpg', cv2.applyColorMap(gray_frame, colormap))[1].tobytes()
+                     if gray_frame is not None and self.frame_hub.watched(channel) else None
+                     for channel, colormap in FALSE_COLOUR_MAPS)
+
+    def encode_views(self, detection):
+        """Encode stage: the annotated frame and the watched false-colour views as JPEG bytes."""
+        frame_resized, result = detection
+        return (cv2.imencode('.jpg', result.plot())[1].tobytes(),
+                *self.false_colour_views(self.false_colour_source(frame_resized)))
+
+    def publish_views(self, views):
+        for channel, frame in zip(FRAME_CHANNELS, views):
+            if frame is not None:
+                self.frame_hub.publish(channel, frame)
+
+    def run_detector_process(self):
+        """Feed `frame_ring` from a detector process until the source ends or processing is stopped."""
+        source = 0 if self.use_webcam else self.video_file_path
+        self.release_video()  # The child opens the source itself
+        ring, process = start_detector(source, MODEL_PATH)
+        with self.ring_lock:
+            self.frame_ring, self.ring_sequence = ring, -1
+            self.ring_chunk = self.ring_total = 0
+        while process.poll() is None and not self.stop_event.wait(1 / STREAM_FPS):
+            self.refresh_from_ring()
+        process.terminate()
+        process.wait()
+        process.stdin.close()
+        self.refresh_from_ring()  # Keep the final frame on screen once the ring is gone
+        with self.ring_lock:
+            self.frame_ring = None
+            ring.close()
+
+    def draw_detections(self, frame, detections):
+        """Draw (n, 6) ring detections onto a frame."""
+        for x1, y1, x2, y2, confidence, class_id in detections:
+            label = self.model.names[int(class_id)]
+            color = (0, 0, 255) if label == "Unauthorized" else (0, 255, 0)
+            cv2.rectangle(frame, (int(x1), int(y1)), (int(x2), int(y2)), color, 2)
+            cv2.putText(frame, f"{label} {confidence:.2f}", (int(x1), int(y1) - 10),
+                        cv2.FONT_HERSHEY_SIMPLEX, 0.5, color, 2)
+
+    def refresh_from_ring(self):
+        """Encode the newest shared-memory frame; this runs at display rate, not once per captured frame."""
+        with self.ring_lock:
+            if self.frame_ring is None:
+                return
+            newest = self.frame_ring.latest(after=self.ring_sequence, copy=False)
+            if newest is None:
+                return
+            sequence, frame, detections, _ = newest
+            # Read straight from the shared views, then check the writer did not lap this slot meanwhile
+            annotated = frame.copy()
+            detections = detections.copy()
+            gray_frame = self.false_colour_source(frame)
+            if not self.frame_ring.valid(sequence):
+                return
+            self.ring_sequence = sequence
+            # Tracked in the child on every detector frame, including those not sampled here
+            intruders = self.frame_ring.intruders
+            # The child reports a running total of distinct intruders, so a chunk's count is what it added;
+            # chunks follow the ring's frame sequence, not the frames sampled here
+            chunk = sequence // CHUNK_FRAMES
+            if chunk != self.ring_chunk:
+                self.record_count("video", intruders - self.ring_total)
+                self.ring_chunk, self.ring_total = chunk, intruders
+
+        if intruders:
+            self.unauthorized_detected = True
+        self.draw_detections(annotated, detections)
+        self.publish_views((cv2.imencode('.jpg', annotated)[1].tobytes(), *self.false_colour_views(gray_frame)))
+
+    def process_video(self):
+        if self.video_capture is None:
+            print("Error: video_capture is None. Exiting the video processing thread.")
+            return
+        if USE_DETECTOR_PROCESS:
+            self.run_detector_process()
+            print("Video processing completed.")
+            return
+
+        self.frame_count = 0
+        self.chunk_intruders = set()
+        self.current_intruders = set()
+        self.motion_gate.reset()
+        self.tracker = Tracker()
+        # Live cameras drop stale frames; uploaded files keep every frame and are inferred in batches
+        if self.use_webcam:
+            pipeline = FramePipeline(self.video_capture.read, self.detect_frame, self.encode_views,
+                                     self.publish_views, live=True, stop_event=self.stop_event)
+        else:
+            pipeline = FramePipeline(self.video_capture.read, self.detect_frames, self.encode_views,
+                                     self.publish_views, stop_event=self.stop_event, batch_size=OFFLINE_BATCH_SIZE)
+        pipeline.run()
+        print("Video processing completed.")
+
+    def stop_processing(self):
+        self.stop_event.set()
+        self.processing_thread.join()
+        self.release_video()
+        self.processing_started = False
+
+    def open_upload(self, contents):
+        """Stop any running processing and open an uploaded video; returns its data URI, or None if unreadable."""
+        if self.processing_started:
+            self.stop_processing()
+
+        content_type, content_string = contents.split(',')
+        video_data = base64.b64decode(content_string)
+        temp_file = tempfile.NamedTemporaryFile(delete=False, suffix='.mp4')
+        temp_file.write(video_data)
+        temp_file.close()
+
+        self.video_file_path = temp_file.name
+        self.video_capture = cv2.VideoCapture(self.video_file_path)
+
+        if self.video_capture.isOpened():
+            print(f"Video file uploaded: {self.video_file_path}")
+            return f"data:video/mp4;base64,{base64.b64encode(video_data).decode()}"
+        print("Error: Could not open video file.")
+        return None
+
+    def frame_sources(self, shown, versions):
+        """Image sources for the polled views: a data URI per changed channel, dash.no_update for the rest.
+
+        False-colour channels not in `shown` are not polled, so the hub
+        stops counting them as watched; their image is cleared once.
+        """
+        # Each frame is encoded once in the hub; a browser that already shows a version is sent nothing
+        versions = dict(versions or {})
+        sources = []
+        for channel in FRAME_CHANNELS:
+            if channel != "detection" and channel not in shown:
+                sources.append(None if versions.pop(channel, None) is not None else dash.no_update)
+                continue
+            version, uri = self.frame_hub.data_uri(channel)
+            if versions.get(channel) == version:
+                sources.append(dash.no_update)
+            else:
+                sources.append(uri)
+                versions[channel] = version
+        return sources, versions
+
+    def camera_tiles(self, n_intervals):
+        """One tile per post camera; the query string makes the browser fetch the newest frame."""
+        # Polled rather than streamed: a stream per camera would use up the browser's ~6 connections per host
+        failed = self.camera_manager.failed()
+        tiles = [
+            dbc.Col([
+                html.Img(src=f"/camera/{name}.jpg?n={n_intervals}", style={"width": "100%"}),
+                html.Small(f"{name}: failed ({failed[name]})" if name in failed
+                           else f"{name}: {stats.fps:.1f} fps, {stats.dropped} dropped"),
+            ], width=3)
+            for name, stats in self.camera_manager.stats().items()
+        ]
+        return dbc.Row(tiles)
+
+    def register(self, app):
+        """Add the stream, camera and patrol plot routes and the vigilance callbacks to a Dash app."""
+        server = app.server
+
+        @server.route("/stream/<channel>.mjpg")
+        def stream_frames(channel):
+            """MJPEG push stream of one view; `?fps=` lowers this client's frame rate."""
+            if channel not in FRAME_CHANNELS:
+                abort(404)
+            fps = request.args.get("fps", STREAM_FPS, type=float)
+            return Response(self.frame_hub.mjpeg(channel, fps),
+                            mimetype=f"multipart/x-mixed-replace; boundary={BOUNDARY}",
+                            headers={"Cache-Control": "no-store"})
+
+        @server.route("/camera/<name>.jpg")
+        def serve_camera_frame(name):
+            frame = self.camera_manager.latest(name)
+            if frame is None:
+                abort(404)
+            return Response(frame, mimetype="image/jpeg", headers={"Cache-Control": "no-store"})
+
+        @server.route("/path-plot/<name>.png")
+        def serve_path_plot(name):
+            if name not in PATH_PLOTS:
+                abort(404)
+            return Response(path_plot_png(name), mimetype="image/png", headers={"Cache-Control": "max-age=3600"})
+
+        @app.callback(
+            Output('camera-grid', 'children'),
+            Input('interval-component', 'n_intervals')
+        )
+        def update_camera_grid(n_intervals):
+            return self.camera_tiles(n_intervals)
+
+        @app.callback(
+            Output('video-display', 'src'),
+            [Input('upload-video', 'contents')],
+            [State('upload-video', 'filename')]
+        )
+        def display_video(contents, filename):
+            if contents and not self.use_webcam:
+                return self.open_upload(contents)
+            return None
+
+        @app.callback(
+            Output('live-detection', 'src'),
+            Output('thermal-frame', 'src'),
+            Output('magma-frame', 'src'),
+            Output('unauthorized-alert', 'is_open'),
+            Output('frame-versions', 'data'),
+            Input('interval-component', 'n_intervals'),
+            Input('false-colour-views', 'value'),
+            State('frame-versions', 'data')
+        )
+        def update_frames(n_intervals, shown, versions):
+            shown = shown or []
+            if PUSH_FRAMES:
+                # The images stream over MJPEG and only the alert is polled. A toggle sets or clears a view's
+                # src; a cleared src makes the browser drop the stream, so the hub stops building that view.
+                toggled = any(trigger['prop_id'].startswith('false-colour-views')
+                              for trigger in dash.callback_context.triggered)
+                views = [(stream_source(channel) if channel in shown else None) if toggled else dash.no_update
+                         for channel, _ in FALSE_COLOUR_MAPS]
+                return (dash.no_update, *views, self.unauthorized_detected, dash.no_update)
+            sources, versions = self.frame_sources(shown, versions)
+            return (*sources, self.unauthorized_detected, versions)
+
+        @app.callback(
+            Output('dummy-div', 'children'),
+            Input('start-processing', 'n_clicks'),
+            Input('stop-processing', 'n_clicks'),
+            Input('toggle-webcam', 'n_clicks'),
+            prevent_initial_call=True
+        )
+        def manage_processing(start_clicks, stop_clicks, toggle_webcam_clicks):
+            ctx = dash.callback_context
+            if not ctx.triggered:
+                return dash.no_update
+
+            triggered_id = ctx.triggered[0]['prop_id'].split('.')[0]
+
+            if triggered_id == 'start-processing' and not self.processing_started:
+                self.stop_event.clear()
+                if self.use_webcam:
+                    self.video_capture = cv2.VideoCapture(0)
+                self.processing_thread = Thread(target=self.process_video)
+                self.processing_thread.start()
+                self.processing_started = True
+            elif triggered_id == 'stop-processing' and self.processing_started:
+                self.stop_processing()
+            elif triggered_id == 'toggle-webcam':
+                self.use_webcam = not self.use_webcam
+                self.release_video()
+
+            return None
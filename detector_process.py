@@ -0,0 +1,77 @@
+import os
+import signal
+import subprocess
+import sys
+import threading
+
+import cv2
+
+from frame_ring import FrameRing
+from motion_gate import MotionGate
+from tracker import Tracker
+
+
+def detector_main(source, ring_name, model_path, frame_size, stop_event):
+    """Child process body: capture, resize, detect, track and put every frame with its detections into the ring."""
+    from ultralytics import YOLO
+
+    ring = FrameRing.attach(ring_name)
+    model = YOLO(model_path)
+    intruder_classes = [class_id for class_id, name in model.names.items() if name == "Unauthorized"]
+    capture = cv2.VideoCapture(source)
+    gate = MotionGate()
+    tracker = Tracker()
+    detections = None
+    try:
+        while not stop_event.is_set():
+            success, frame = capture.read()
+            if not success:
+                break
+            frame = cv2.resize(frame, frame_size)
+            # Still frames keep the previous detections and do not advance the tracker
+            if gate.check(frame):
+                detections = model.predict(frame, verbose=False)[0].boxes.data.cpu().numpy()
+                tracker.update(detections[:, :4], detections[:, 5])
+            intruders = sum(tracker.unique_count(class_id) for class_id in intruder_classes)
+            ring.put(frame, detections, intruders)
+    finally:
+        capture.release()
+        ring.close()
+
+
+def stop_with_parent(stop_event):
+    """Set `stop_event` once the parent is gone, so the child releases the camera and ring rather than outliving it.
+
+    The parent holds the write end of the child's stdin and never writes:
+    it closes when the parent exits, however it exits, and the read ends.
+    """
+    def watch():
+        sys.stdin.buffer.read()
+        stop_event.set()
+
+    threading.Thread(target=watch, daemon=True).start()
+
+
+def start_detector(source, model_path, frame_size=(960, 540), slots=8):
+    """Run capture and YOLO in a separate process feeding a new shared-memory ring.
+
+    Returns (ring, process); `process.terminate()` asks the child to stop,
+    then wait for it and close the ring. The child runs this module as a
+    script, so it imports only what detection needs rather than
+    re-running the dashboard that started it, and stops by itself if the
+    dashboard dies.
+    """
+    ring = FrameRing(slots=slots, frame_shape=(frame_size[1], frame_size[0], 3))
+    process = subprocess.Popen([sys.executable, os.path.abspath(__file__), str(source), ring.name,
+                                os.path.abspath(model_path), str(frame_size[0]), str(frame_size[1])],
+                               stdin=subprocess.PIPE)
+    return ring, process
+
+
+if __name__ == "__main__":
+    source, ring_name, model_path, width, height = sys.argv[1:6]
+    stop_event = threading.Event()
+    signal.signal(signal.SIGTERM, lambda signum, frame: stop_event.set())
+    stop_with_parent(stop_event)
+    detector_main(int(source) if source.isdigit() else source, ring_name, model_path, (int(width), int(height)),
+                  stop_event)
@@ -0,0 +1,339 @@
+import heapq
+import math
+import time
+
+import numpy as np
+
+from path_planner import MOVES, Node, bfs_field, bfs_fields, cell_index, flat_occupancy, index_cell
+
+
+class ReservationTable:
+    """Space-time reservations made by the drones planned so far.
+
+    Keys are packed into ints so the hash sets stay cheap: a cell at time t
+    is `t * cells + index`, and a move from `a` at t to `b` at t + 1 is
+    `(t * cells + a) * cells + b`. A drone that has landed holds its goal
+    cell from its arrival time on.
+    """
+    def __init__(self, cells):
+        self.cells = cells
+        self.vertices = set()
+        self.edges = set()
+        self.holds = {}
+        self.last_use = {}
+
+    def reserve(self, indices):
+        """Reserve a path given as one flat cell index per time step."""
+        cells = self.cells
+        previous = None
+        for t, index in enumerate(indices):
+            self.vertices.add(t * cells + index)
+            if self.last_use.get(index, -1) < t:
+                self.last_use[index] = t
+            if previous is not None:
+                self.edges.add(((t - 1) * cells + previous) * cells + index)
+            previous = index
+        self.holds[indices[-1]] = len(indices) - 1
+
+    def is_free(self, index, t):
+        if t * self.cells + index in self.vertices:
+            return False
+        hold = self.holds.get(index)
+        return hold is None or t < hold
+
+    def swaps(self, a, b, t):
+        """True if moving a -> b between t and t + 1 would swap places with a reserved b -> a."""
+        return ((t * self.cells + b) * self.cells + a) in self.edges
+
+    def admits(self, indices):
+        """True if a path, one flat cell index per time step, clashes with no reservation and can land."""
+        if self.last_use.get(indices[-1], -1) >= len(indices) - 1:
+            return False
+        previous = None
+        for t, index in enumerate(indices):
+            if not self.is_free(index, t):
+                return False
+            if previous is not None and previous != index and self.swaps(previous, index, t - 1):
+                return False
+            previous = index
+        return True
+
+
+def spans_obstacles(occupancy, start, goal):
+    """True if the rectangle spanned by two cells contains a blocked cell."""
+    x0, x1 = sorted((start[0], goal[0]))
+    y0, y1 = sorted((start[1], goal[1]))
+    return bool(occupancy[x0:x1 + 1, y0:y1 + 1].any())
+
+
+class GoalDistance:
+    """Admissible steps-to-goal estimate for one drone, playing the part of WHCA*'s reverse search.
+
+    If the rectangle spanned by start and goal is free of obstacles, the
+    obstacle-free step count is exact inside it and a lower bound outside,
+    so nothing is searched. Otherwise a vectorized BFS from the goal runs
+    out to the start and gives exact step counts within that radius;
+    cells beyond it are bounded by the radius. Exact values matter here:
+    with time as an extra dimension, a heuristic that ignores a wall lets
+    the search revisit the dead end behind it at every time step. `field`
+    takes that BFS precomputed, e.g. a row of `bfs_fields` for a fleet.
+    """
+    def __init__(self, occupancy, goal, start, connectivity=4, field=None):
+        self.height = occupancy.shape[1]
+        self.connectivity = connectivity
+        self.goal = goal
+        if field is None and not spans_obstacles(occupancy, start, goal):
+            self.field = None
+            self.reachable = True
+            self.expanded = 0
+            return
+
+        start_index = cell_index(start, self.height)
+        if field is None:
+            field = bfs_field(occupancy, [goal], [start_index], connectivity=connectivity)
+        self.field = memoryview(field)
+        self.radius = float(field[start_index])
+        self.reachable = self.radius != math.inf
+        self.expanded = int(np.isfinite(field).sum())
+
+    def estimator(self):
+        """Return estimate(index) for the space-time search's inner loop."""
+        height = self.height
+        goal_x, goal_y = self.goal
+        four = self.connectivity == 4
+
+        def steps(index):
+            dx, dy = abs(index // height - goal_x), abs(index % height - goal_y)
+            return dx + dy if four else (dx if dx > dy else dy)
+
+        if self.field is None:
+            return steps
+
+        field, beyond = self.field, self.radius + 1
+
+        def estimate(index):
+            exact = field[index]
+            if exact != math.inf:
+                return exact
+            bound = steps(index)
+            return bound if bound > beyond else beyond
+        return estimate
+
+    def shortest_path(self, occupancy, start):
+        """Flat indices of a shortest route from `start` to the goal when no other drone is in the way.
+
+        The estimate is exact between start and goal, so the route just
+        steps to a neighbor one closer each time; no search is needed.
+        Returns None if the goal is unreachable.
+        """
+        if not self.reachable:
+            return None
+        width, height = occupancy.shape
+        blocked = memoryview(flat_occupancy(occupancy))
+        moves = [(dx, dy, dx * height + dy) for dx, dy, _ in MOVES[self.connectivity]]
+        estimate = self.estimator()
+        index = cell_index(start, height)
+        path = [index]
+        remaining = estimate(index)
+        while remaining:
+            x, y = divmod(index, height)
+            for dx, dy, offset in moves:
+                if not (0 <= x + dx < width and 0 <= y + dy < height):
+                    continue
+                neighbor = index + offset
+                if blocked[neighbor] or (dx and dy and (blocked[index + dx * height] or blocked[index + dy])):
+                    continue
+                if estimate(neighbor) == remaining - 1:
+                    break
+            index = neighbor
+            remaining -= 1
+            path.append(index)
+        return path
+
+
+class FleetPlan:
+    """Collision-free routes for a drone fleet.
+
+    `paths[i]` lists drone i's (x, y) cell at every time step until it lands,
+    or is None if no route was found within the horizon. `conflicts_resolved`
+    counts the vertex and swap conflicts the independent shortest paths had.
+    """
+    def __init__(self, paths, conflicts_resolved, expanded, wall_time):
+        self.paths = paths
+        self.conflicts_resolved = conflicts_resolved
+        self.expanded = expanded
+        self.wall_time = wall_time
+
+    @property
+    def makespan(self):
+        """Time step at which the last drone lands."""
+        return max((len(path) - 1 for path in self.paths if path), default=0)
+
+    @property
+    def failed(self):
+        return [agent for agent, path in enumerate(self.paths) if path is None]
+
+    def nodes(self, agent):
+        """Drone `agent`'s route as a chain of timed Nodes, cost being the time step."""
+        route, parent = [], None
+        for t, (x, y) in enumerate(self.paths[agent] or []):
+            parent = Node(x, y, t, parent, t)
+            route.append(parent)
+        return route
+
+    def __repr__(self):
+        return (f"FleetPlan(drones={len(self.paths)}, makespan={self.makespan}, "
+                f"conflicts_resolved={self.conflicts_resolved}, failed={len(self.failed)})")
+
+
+def count_conflicts(paths):
+    """Vertex and swap conflicts between paths, each drone staying on its last cell once it arrives."""
+    paths = [path for path in paths if path]
+    if len(paths) < 2:
+        return 0
+    horizon = max(len(path) for path in paths)
+    # (drones, horizon) grid of packed cells, padded with each drone's goal
+    cells = np.array([[x * 65536 + y for x, y in path] + [path[-1][0] * 65536 + path[-1][1]] * (horizon - len(path))
+                      for path in paths], dtype=np.int64)
+
+    conflicts = 0
+    for t in range(horizon):
+        _, counts = np.unique(cells[:, t], return_counts=True)
+        conflicts += int((counts - 1).sum())
+    for t in range(horizon - 1):
+        moving = cells[:, t] != cells[:, t + 1]
+        moves = set(zip(cells[moving, t].tolist(), cells[moving, t + 1].tolist()))
+        conflicts += sum(1 for a, b in moves if (b, a) in moves) // 2
+    return conflicts
+
+
+def space_time_search(occupancy, start, goal, reservations, connectivity=4, max_time=None, steps_to_goal=None):
+    """Shortest-time route from `start` to `goal` that respects `reservations`.
+
+    States are (cell, time step); each step moves to a neighbor or waits in
+    place. The goal is accepted only once no reserved path visits it later,
+    so the drone can stay there. `steps_to_goal` is the drone's
+    `GoalDistance`, built here unless passed in to be shared. Returns
+    (flat index path, expanded), with no path if the goal is unreachable.
+    """
+    width, height = occupancy.shape
+    cells = width * height
+    blocked = memoryview(flat_occupancy(occupancy))
+    moves = [(0, 0, 0)] + [(dx, dy, dx * height + dy) for dx, dy, _ in MOVES[connectivity]]
+    start_index = cell_index(start, height)
+    goal_index = cell_index(goal, height)
+    settle = reservations.last_use.get(goal_index, -1)
+    if max_time is None:
+        max_time = 2 * (width + height) + settle
+
+    if steps_to_goal is None:
+        steps_to_goal = GoalDistance(occupancy, goal, start, connectivity)
+    if not steps_to_goal.reachable or not reservations.is_free(start_index, 0):
+        return None, 0
+    estimate = steps_to_goal.estimator()
+    # ReservationTable.is_free and swaps, inlined: a state key is also its vertex reservation key
+    vertices, edges, holds = reservations.vertices, reservations.edges, reservations.holds
+    parents = {start_index: None}
+    # Entries are (f, h, -t, index). Arrival can be no earlier than just after the
+    # goal's last reservation, and ties go to states closer to the goal
+    remaining = estimate(start_index)
+    open_list = [(max(remaining, settle + 1), remaining, 0, start_index)]
+    expanded = 0
+
+    while open_list:
+        _, _, neg_t, index = heapq.heappop(open_list)
+        t = -neg_t
+        layer = t * cells
+        state = layer + index
+        expanded += 1
+
+        if index == goal_index and t > settle:
+            path = []
+            while state is not None:
+                path.append(state % cells)
+                state = parents[state]
+            return path[::-1], expanded
+        if t >= max_time:
+            continue
+
+        x, y = divmod(index, height)
+        next_t = t + 1
+        next_layer = layer + cells
+        for dx, dy, offset in moves:
+            neighbor_x, neighbor_y = x + dx, y + dy
+            if not (0 <= neighbor_x < width and 0 <= neighbor_y < height):
+                continue
+            neighbor = index + offset
+            if blocked[neighbor]:
+                continue
+            if dx and dy and (blocked[index + dx * height] or blocked[index + dy]):
+                continue
+            next_state = next_layer + neighbor
+            if next_state in parents or next_state in vertices:
+                continue
+            hold = holds.get(neighbor)
+            if hold is not None and next_t >= hold:
+                continue
+            if offset and (layer + neighbor) * cells + index in edges:
+                continue
+            parents[next_state] = state
+            remaining = estimate(neighbor)
+            arrival = next_t + remaining
+            heapq.heappush(open_list, (arrival if arrival > settle else settle + 1, remaining, -next_t, neighbor))
+
+    return None, expanded
+
+
+def plan_fleet(occupancy, starts, goals, connectivity=4, max_time=None, order=None):
+    """Prioritized cooperative planning for several drones on one grid.
+
+    Drones are planned one after another (longest trip first unless `order`
+    is given); each runs a space-time A* around the reservations of those
+    planned before it and then reserves its own route. A drone whose
+    independent shortest route clashes with nothing reserved keeps that
+    route without searching, since no route can be quicker. Every move or wait
+    takes one time step, and no two drones share a cell or swap cells
+    between steps. Starts and goals are Nodes or (x, y) tuples.
+    """
+    started = time.perf_counter()
+    starts = [(node.x, node.y) if isinstance(node, Node) else tuple(node) for node in starts]
+    goals = [(node.x, node.y) if isinstance(node, Node) else tuple(node) for node in goals]
+    if len(starts) != len(goals):
+        raise ValueError(f"Got {len(starts)} starts but {len(goals)} goals")
+    if len(set(starts)) != len(starts) or len(set(goals)) != len(goals):
+        raise ValueError("Drones must have distinct start cells and distinct goal cells")
+
+    width, height = occupancy.shape
+    # The goal fields of all drones that need one are searched together
+    walled = [agent for agent in range(len(starts)) if spans_obstacles(occupancy, starts[agent], goals[agent])]
+    fields = {}
+    if walled:
+        rows = bfs_fields(occupancy, [goals[agent] for agent in walled],
+                          [cell_index(starts[agent], height) for agent in walled], connectivity)
+        fields = dict(zip(walled, rows))
+    heuristics = [GoalDistance(occupancy, goals[agent], starts[agent], connectivity, fields.get(agent))
+                  for agent in range(len(starts))]
+    expanded = sum(heuristic.expanded for heuristic in heuristics)
+
+    # Independent shortest routes: the conflict baseline and the default priorities
+    shortest = [heuristic.shortest_path(occupancy, start) for start, heuristic in zip(starts, heuristics)]
+    independent = [None if indices is None else [index_cell(index, height) for index in indices]
+                   for indices in shortest]
+    if order is None:
+        order = sorted(range(len(starts)), key=lambda agent: -len(independent[agent] or ()))
+
+    reservations = ReservationTable(width * height)
+    paths = [None] * len(starts)
+    for agent in order:
+        indices = shortest[agent]
+        if indices is None:
+            continue
+        if (max_time is not None and len(indices) - 1 > max_time) or not reservations.admits(indices):
+            indices, searched = space_time_search(occupancy, starts[agent], goals[agent], reservations,
+                                                  connectivity, max_time, heuristics[agent])
+            expanded += searched
+        if indices is not None:
+            reservations.reserve(indices)
+            paths[agent] = [index_cell(index, height) for index in indices]
+
+    return FleetPlan(paths, count_conflicts(independent), expanded, time.perf_counter() - started)
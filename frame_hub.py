@@ -0,0 +1,114 @@
+import base64
+import threading
+import time
+
+BOUNDARY = "frame"
+# Upper bound on any client's requested frame rate
+MAX_STREAM_FPS = 30
+# A channel polled through `data_uri` counts as watched for this many seconds afterwards
+POLL_WATCH_SECONDS = 5.0
+
+
+class FrameHub:
+    """Latest encoded frame per channel, with a condition variable that wakes streams on new frames.
+
+    Publishers replace a channel's frame and bump its version; each
+    subscriber waits for a version newer than the one it last sent, so a
+    slow client skips straight to the newest frame instead of queueing
+    stale ones. Polling clients get `data_uri`, which base64-encodes each
+    version once however many clients ask for it. Open streams and recent
+    polls mark a channel as watched, so publishers can skip building views
+    that nobody would see.
+    """
+    def __init__(self):
+        self._frames = {}
+        self._uris = {}
+        self._subscribers = {}
+        self._polled = {}
+        self._closed = False
+        self._condition = threading.Condition()
+        self._uri_lock = threading.Lock()
+
+    def publish(self, channel, data):
+        """Make `data` the channel's newest frame; returns its version."""
+        with self._condition:
+            version = self._frames.get(channel, (0, None))[0] + 1
+            self._frames[channel] = (version, data)
+            self._condition.notify_all()
+        return version
+
+    def latest(self, channel):
+        """(version, data) of the channel's newest frame; (0, None) before the first."""
+        return self._frames.get(channel, (0, None))
+
+    def watched(self, channel):
+        """True while a stream of the channel is open or a client polled it recently."""
+        return (self._subscribers.get(channel, 0) > 0
+                or time.monotonic() - self._polled.get(channel, float("-inf")) < POLL_WATCH_SECONDS)
+
+    def data_uri(self, channel, mime="image/jpeg"):
+        """(version, data URI) of the channel's newest frame, encoded once per version; (0, "") before the first."""
+        self._polled[channel] = time.monotonic()
+        version, data = self.latest(channel)
+        if data is None:
+            return 0, ""
+        cached = self._uris.get(channel)
+        if cached is not None and cached[0] >= version:
+            return cached
+        with self._uri_lock:
+            cached = self._uris.get(channel)
+            if cached is None or cached[0] < version:
+                cached = (version, f"data:{mime};base64,{base64.b64encode(data).decode('ascii')}")
+                self._uris[channel] = cached
+        return cached
+
+    def wait(self, channel, after=0, timeout=None):
+        """Block until the channel has a frame newer than version `after`; None on timeout or close."""
+        with self._condition:
+            ready = self._condition.wait_for(
+                lambda: self._closed or self._frames.get(channel, (0, None))[0] > after, timeout)
+            if not ready or self._closed:
+                return None
+            return self._frames[channel]
+
+    def close(self):
+        """End every open stream."""
+        with self._condition:
+            self._closed = True
+            self._condition.notify_all()
+
+    def mjpeg(self, channel, max_fps=MAX_STREAM_FPS, keepalive=10.0):
+        """Generator of multipart/x-mixed-replace parts for one MJPEG client.
+
+        Each new frame is sent once, no faster than `max_fps`; frames that
+        arrive while the client is rate-limited are skipped. A stream may
+        open before anything is published and stays open until the client
+        disconnects or the hub closes: after `keepalive` seconds without a
+        new frame the newest one is sent again, which keeps idle connections
+        alive and lets the server notice clients that have gone. While it is
+        open the channel counts as watched.
+        """
+        interval = 1.0 / min(max(max_fps, 0.1), MAX_STREAM_FPS)
+        version, next_send = 0, 0.0
+        with self._condition:
+            self._subscribers[channel] = self._subscribers.get(channel, 0) + 1
+        try:
+            while True:
+                delay = next_send - time.monotonic()
+                if delay > 0:
+                    time.sleep(delay)
+                frame = self.wait(channel, version, keepalive)
+                if frame is None:
+                    if self._closed:
+                        return
+                    frame = self.latest(channel)
+                    if frame[1] is None:
+                        continue
+                version, data = frame
+                next_send = time.monotonic() + interval
+                yield (f"--{BOUNDARY}\r\nContent-Type: image/jpeg\r\nContent-Length: {len(data)}\r\n\r\n".encode()
+                       + data + b"\r\n")
+        finally:
+            # Runs when the client disconnects and the server closes the generator
+            with self._condition:
+                self._subscribers[channel] -= 1
@@ -0,0 +1,178 @@
+import os
+import sys
+import time
+from multiprocessing import resource_tracker, shared_memory
+
+import numpy as np
+
+# Header slots: geometry first so a reader can attach knowing only the name, then the write counter and
+# the writer's running count of distinct intruders
+HEADER_FIELDS = ("slots", "height", "width", "channels", "max_detections", "written", "intruders")
+HEADER_SIZE = 8
+# Detection rows are x1, y1, x2, y2, confidence, class id
+DETECTION_FIELDS = 6
+# Python 3.13 can attach to a block without registering it with the resource tracker
+ATTACH_UNTRACKED = sys.version_info >= (3, 13)
+
+# Names of the rings this process created, whose tracker registration belongs to the creator
+_created = set()
+
+
+def ring_layout(slots, frame_shape, max_detections):
+    """Byte offsets of each array in the shared block, and its total size."""
+    height, width, channels = frame_shape
+    sizes = [
+        ("header", HEADER_SIZE * 8),
+        ("sequences", slots * 8),
+        ("timestamps", slots * 8),
+        ("counts", slots * 4),
+        ("detections", slots * max_detections * DETECTION_FIELDS * 4),
+        ("frames", slots * height * width * channels),
+    ]
+    offsets, total = {}, 0
+    for name, size in sizes:
+        offsets[name] = total
+        # Keep every array 64-byte aligned
+        total += (size + 63) // 64 * 64
+    return offsets, total
+
+
+class FrameRing:
+    """Fixed-size ring of raw frames and their detections in shared memory.
+
+    One process writes with `put`; any number of processes attach by name
+    and read without copying through NumPy views into the same block.
+    Each slot has a sequence number that the writer sets to -1 while it
+    fills the slot and to the frame's sequence once done. A reader checks it
+    before and after reading (a seqlock), so a torn frame is detected and
+    retried rather than shown. With `slots` frames of history a reader has
+    that many frame intervals to finish before its slot is overwritten.
+    """
+    def __init__(self, name=None, slots=8, frame_shape=(540, 960, 3), max_detections=64, create=True):
+        if create:
+            if slots < 2:
+                raise ValueError(f"A ring needs at least 2 slots, got {slots}")
+            _, size = ring_layout(slots, frame_shape, max_detections)
+            self.memory = shared_memory.SharedMemory(name=name, create=True, size=size)
+            _created.add(self.memory.name)
+            header = np.ndarray(HEADER_SIZE, dtype=np.int64, buffer=self.memory.buf)
+            header[:] = 0
+            header[:5] = (slots, *frame_shape, max_detections)
+        elif ATTACH_UNTRACKED:
+            self.memory = shared_memory.SharedMemory(name=name, track=False)
+        else:
+            self.memory = shared_memory.SharedMemory(name=name)
+            # Attaching registers the block with this process's resource tracker, which would unlink it
+            # when this process exits; only the creator's close() may do that. In the creating process the
+            # registration is the creator's own, so it stays. The tracker knows POSIX blocks by "/" + name.
+            if os.name == "posix" and self.memory.name not in _created:
+                resource_tracker.unregister(f"/{self.memory.name}", "shared_memory")
+            header = np.ndarray(HEADER_SIZE, dtype=np.int64, buffer=self.memory.buf)
+            slots, frame_shape, max_detections = int(header[0]), tuple(int(v) for v in header[1:4]), int(header[4])
+        del header
+
+        self.owner = create
+        self.slots = slots
+        self.frame_shape = frame_shape
+        self.max_detections = max_detections
+        offsets, _ = ring_layout(slots, frame_shape, max_detections)
+        buffer = self.memory.buf
+        self._header = np.ndarray(HEADER_SIZE, dtype=np.int64, buffer=buffer, offset=offsets["header"])
+        self._sequences = np.ndarray(slots, dtype=np.int64, buffer=buffer, offset=offsets["sequences"])
+        self._timestamps = np.ndarray(slots, dtype=np.float64, buffer=buffer, offset=offsets["timestamps"])
+        self._counts = np.ndarray(slots, dtype=np.int32, buffer=buffer, offset=offsets["counts"])
+        self._detections = np.ndarray((slots, max_detections, DETECTION_FIELDS), dtype=np.float32,
+                                      buffer=buffer, offset=offsets["detections"])
+        self._frames = np.ndarray((slots, *frame_shape), dtype=np.uint8, buffer=buffer, offset=offsets["frames"])
+        if create:
+            self._sequences[:] = -1
+
+    @classmethod
+    def attach(cls, name):
+        """Open an existing ring created by another process."""
+        return cls(name, create=False)
+
+    @property
+    def name(self):
+        return self.memory.name
+
+    @property
+    def written(self):
+        """Number of frames put so far; the newest has sequence `written - 1`."""
+        return int(self._header[5])
+
+    @property
+    def intruders(self):
+        """Distinct intruders the writer has tracked so far, as of the newest frame."""
+        return int(self._header[6])
+
+    def put(self, frame, detections=None, intruders=None):
+        """Copy a frame and its (n, 6) detections into the next slot; returns the frame's sequence.
+
+        `intruders` updates the running count of distinct intruders before
+        the frame is published, so a reader that sees the frame sees it too.
+        """
+        if frame.shape != self.frame_shape:
+            raise ValueError(f"Frame shape {frame.shape} does not match the ring's {self.frame_shape}")
+        sequence = self.written
+        slot = sequence % self.slots
+        self._sequences[slot] = -1
+        self._frames[slot] = frame
+        count = 0
+        if detections is not None and len(detections):
+            detections = np.asarray(detections, dtype=np.float32).reshape(-1, DETECTION_FIELDS)
+            count = min(len(detections), self.max_detections)
+            self._detections[slot, :count] = detections[:count]
+        self._counts[slot] = count
+        self._timestamps[slot] = time.time()
+        self._sequences[slot] = sequence
+        if intruders is not None:
+            self._header[6] = intruders
+        self._header[5] = sequence + 1
+        return sequence
+
+    def view(self, sequence):
+        """Zero-copy (frame, detections, timestamp) views of frame `sequence`, or None if it is gone.
+
+        The views alias the ring: check `valid(sequence)` after using them,
+        since the writer may have reused the slot in the meantime.
+        """
+        if sequence < 0:
+            return None
+        slot = sequence % self.slots
+        if self._sequences[slot] != sequence:
+            return None
+        count = int(self._counts[slot])
+        return self._frames[slot], self._detections[slot, :count], float(self._timestamps[slot])
+
+    def valid(self, sequence):
+        return sequence >= 0 and self._sequences[sequence % self.slots] == sequence
+
+    def latest(self, after=-1, copy=True):
+        """(sequence, frame, detections, timestamp) of the newest frame, or None if none is newer than `after`.
+
+        With `copy=False` the arrays are views into the ring, which is
+        zero-copy but only valid until the writer laps this slot.
+        """
+        for _ in range(self.slots):
+            sequence = self.written - 1
+            if sequence <= after:
+                return None
+            views = self.view(sequence)
+            if views is None:
+                continue
+            frame, detections, timestamp = views
+            if copy:
+                frame, detections = frame.copy(), detections.copy()
+            if self.valid(sequence):
+                return sequence, frame, detections, timestamp
+        return None
+
+    def close(self):
+        # Drop the views first; the block cannot be closed while NumPy still exports it
+        self._header = self._sequences = self._timestamps = self._counts = None
+        self._detections = self._frames = None
+        self.memory.close()
+        if self.owner:
+            self.memory.unlink()
+            _created.discard(self.memory.name)
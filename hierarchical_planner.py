@@ -0,0 +1,226 @@
+import heapq
+import math
+import time
+
+import numpy as np
+
+from path_planner import PlannerStats, PlanResult, astar_search, grid_fingerprint
+
+# Entrances at least this wide get a transition at each end instead of one in the middle
+WIDE_ENTRANCE = 6
+
+
+def open_runs(mask):
+    """(start, end) pairs, end exclusive, of the True runs in a 1-D bool array."""
+    padded = np.concatenate(([0], mask.astype(np.int8), [0]))
+    edges = np.flatnonzero(np.diff(padded))
+    return list(zip(edges[::2].tolist(), edges[1::2].tolist()))
+
+
+class HierarchicalPlanner:
+    """HPA* over a 4-connected occupancy grid split into square clusters.
+
+    Building the abstraction finds the entrances between neighbouring clusters
+    and the in-cluster distances between them once. Queries then search the
+    small abstract graph and refine only the chosen legs inside single
+    clusters, so their cost depends on cluster size rather than map size.
+    """
+    def __init__(self, occupancy, cluster_size=32, abstraction=None):
+        self.occupancy = occupancy
+        self.cluster_size = cluster_size
+        if abstraction is None:
+            abstraction = self._build()
+        self.nodes, self.edges, self.weights = abstraction
+        self._index()
+
+    @classmethod
+    def load(cls, path, occupancy):
+        """Load an abstraction saved with `save`, checking it matches `occupancy`."""
+        with np.load(path) as data:
+            if str(data["fingerprint"]) != grid_fingerprint(occupancy):
+                raise ValueError(f"Abstraction in {path} was built for a different map")
+            abstraction = (data["nodes"], data["edges"], data["weights"])
+            return cls(occupancy, int(data["cluster_size"]), abstraction)
+
+    def save(self, path):
+        """Persist the abstract graph to an .npz file."""
+        np.savez_compressed(
+            path,
+            cluster_size=self.cluster_size,
+            fingerprint=grid_fingerprint(self.occupancy),
+            nodes=self.nodes,
+            edges=self.edges,
+            weights=self.weights,
+        )
+
+    def cluster_of(self, cell):
+        return cell[0] // self.cluster_size, cell[1] // self.cluster_size
+
+    def local_search(self, start, goal):
+        """A* restricted to the cluster containing `start`; both cells must lie in it."""
+        cluster_x, cluster_y = self.cluster_of(start)
+        x0, y0 = cluster_x * self.cluster_size, cluster_y * self.cluster_size
+        window = self.occupancy[x0:x0 + self.cluster_size, y0:y0 + self.cluster_size]
+        result = astar_search(window, (start[0] - x0, start[1] - y0), (goal[0] - x0, goal[1] - y0))
+        if result.path:
+            result.path = [(x + x0, y + y0) for x, y in result.path]
+        return result
+
+    def _build(self):
+        width, height = self.occupancy.shape
+        size = self.cluster_size
+        free = self.occupancy == 0
+        node_ids = {}
+        edges = []
+        weights = []
+
+        def add_node(cell):
+            return node_ids.setdefault(cell, len(node_ids))
+
+        # Entrances across borders between x - 1 and x (line 0), then between y - 1 and y (line 1)
+        for axis_len, other_len, line in ((width, height, 0), (height, width, 1)):
+            for border in range(size, axis_len, size):
+                if line == 0:
+                    both_free = free[border - 1, :] & free[border, :]
+                else:
+                    both_free = free[:, border - 1] & free[:, border]
+                for offset in range(0, other_len, size):
+                    for run_start, run_end in open_runs(both_free[offset:offset + size]):
+                        if run_end - run_start >= WIDE_ENTRANCE:
+                            crossings = (run_start, run_end - 1)
+                        else:
+                            crossings = ((run_start + run_end - 1) // 2,)
+                        for along in crossings:
+                            along += offset
+                            if line == 0:
+                                inside, outside = (border - 1, along), (border, along)
+                            else:
+                                inside, outside = (along, border - 1), (along, border)
+                            edges.append((add_node(inside), add_node(outside)))
+                            weights.append(1)
+
+        # In-cluster distances between every pair of entrances sharing a cluster
+        by_cluster = {}
+        for cell, node_id in node_ids.items():
+            by_cluster.setdefault(self.cluster_of(cell), []).append((cell, node_id))
+        for members in by_cluster.values():
+            for i, (cell, node_id) in enumerate(members):
+                for other_cell, other_id in members[i + 1:]:
+                    result = self.local_search(cell, other_cell)
+                    if result.path:
+                        edges.append((node_id, other_id))
+                        weights.append(result.cost)
+
+        nodes = np.zeros((len(node_ids), 2), dtype=np.int32)
+        for cell, node_id in node_ids.items():
+            nodes[node_id] = cell
+        return (
+            nodes,
+            np.array(edges, dtype=np.int32).reshape(-1, 2),
+            np.array(weights, dtype=np.float32),
+        )
+
+    def _index(self):
+        self.node_ids = {(int(x), int(y)): node_id for node_id, (x, y) in enumerate(self.nodes)}
+        self.adjacency = [[] for _ in range(len(self.nodes))]
+        for (a, b), weight in zip(self.edges.tolist(), self.weights.tolist()):
+            self.adjacency[a].append((b, weight))
+            self.adjacency[b].append((a, weight))
+        self.cluster_nodes = {}
+        for cell, node_id in self.node_ids.items():
+            self.cluster_nodes.setdefault(self.cluster_of(cell), []).append(node_id)
+
+    def plan(self, start, goal):
+        """Plan between two (x, y) cells and return a PlanResult."""
+        started = time.perf_counter()
+        start, goal = tuple(start), tuple(goal)
+        stats = PlannerStats()
+        if self.occupancy[start] or self.occupancy[goal]:
+            return PlanResult(None, math.inf, stats)
+
+        # Same-cluster queries also try the direct in-cluster route; the shorter one wins
+        direct = None
+        if self.cluster_of(start) == self.cluster_of(goal):
+            direct = self.local_search(start, goal)
+            stats.merge(direct.stats)
+
+        # Temporarily wire start and goal into the abstract graph
+        coords = {}
+        extra = {}
+        endpoint_ids = []
+        for cell, node_id in ((start, len(self.nodes)), (goal, len(self.nodes) + 1)):
+            if cell in self.node_ids:
+                endpoint_ids.append(self.node_ids[cell])
+                continue
+            coords[node_id] = cell
+            for entrance_id in self.cluster_nodes.get(self.cluster_of(cell), []):
+                entrance = self.node_cell(entrance_id)
+                result = self.local_search(cell, entrance)
+                stats.merge(result.stats)
+                if result.path:
+                    extra.setdefault(node_id, []).append((entrance_id, result.cost))
+                    extra.setdefault(entrance_id, []).append((node_id, result.cost))
+            endpoint_ids.append(node_id)
+        start_id, goal_id = endpoint_ids
+
+        def cell_of(node_id):
+            return coords[node_id] if node_id in coords else self.node_cell(node_id)
+
+        # A* over the abstract graph
+        best_g = {start_id: 0}
+        parents = {start_id: None}
+        closed = set()
+        open_list = [(abs(start[0] - goal[0]) + abs(start[1] - goal[1]), 0, start_id)]
+        route = None
+        while open_list:
+            _, neg_g, node_id = heapq.heappop(open_list)
+            if node_id in closed:
+                continue
+            closed.add(node_id)
+            stats.expanded += 1
+            if node_id == goal_id:
+                route = []
+                while node_id is not None:
+                    route.append(node_id)
+                    node_id = parents[node_id]
+                route.reverse()
+                cost = -neg_g
+                break
+            base = self.adjacency[node_id] if node_id < len(self.nodes) else []
+            for neighbor, weight in base + extra.get(node_id, []):
+                neighbor_g = weight - neg_g
+                if neighbor in closed or neighbor_g >= best_g.get(neighbor, math.inf):
+                    continue
+                if neighbor in best_g:
+                    stats.reopened += 1
+                best_g[neighbor] = neighbor_g
+                parents[neighbor] = node_id
+                x, y = cell_of(neighbor)
+                neighbor_f = neighbor_g + abs(x - goal[0]) + abs(y - goal[1])
+                heapq.heappush(open_list, (neighbor_f, -neighbor_g, neighbor))
+                stats.pushed += 1
+                stats.peak_open = max(stats.peak_open, len(open_list))
+
+        if direct is not None and direct.path and (route is None or direct.cost <= cost):
+            stats.wall_time = time.perf_counter() - started
+            return PlanResult(direct.path, direct.cost, stats)
+        if route is None:
+            stats.wall_time = time.perf_counter() - started
+            return PlanResult(None, math.inf, stats)
+
+        # Refine each abstract leg into grid cells
+        path = [start]
+        for a, b in zip(route, route[1:]):
+            cell_a, cell_b = cell_of(a), cell_of(b)
+            if abs(cell_a[0] - cell_b[0]) + abs(cell_a[1] - cell_b[1]) == 1:
+                path.append(cell_b)
+                continue
+            leg = self.local_search(cell_a, cell_b)
+            stats.merge(leg.stats)
+            path.extend(leg.path[1:])
+        stats.wall_time = time.perf_counter() - started
+        return PlanResult(path, cost, stats)
+
+    def node_cell(self, node_id):
+        x, y = self.nodes[node_id]
+        return int(x), int(y)
@@ -0,0 +1,273 @@
+import heapq
+import math
+import time
+
+import numpy as np
+
+from path_planner import MOVES, SQRT2, PlannerStats, PlanResult, cell_index, grid_distance, index_cell
+
+# Diagonal costs are irrational, so keys that tie exactly on paper can differ in
+# the last bit; near-ties with the start key keep the search going.
+KEY_TOLERANCE = 1e-9
+
+
+class IncrementalPlanner:
+    """D* Lite planner that keeps its search state between calls.
+
+    The search runs backwards from the goal, so when obstacles appear or clear
+    (for example detections mapped onto grid cells) only the cells whose
+    distance-to-goal actually changes are re-expanded, and the patrol can
+    advance its start cell without invalidating anything. State is held in
+    flat float64 arrays over a private copy of the occupancy grid.
+
+    The first `plan` is an ordinary backward A* over those arrays, without
+    the per-cell bookkeeping repairs need; it leaves exactly the state D*
+    Lite's own first search would, so later repairs carry on from it.
+    """
+    def __init__(self, occupancy, start, goal, connectivity=4):
+        if connectivity not in MOVES:
+            raise ValueError(f"connectivity must be 4 or 8, got {connectivity}")
+        self.occupancy = np.array(occupancy != 0, dtype=np.uint8)
+        self.width, self.height = self.occupancy.shape
+        self.connectivity = connectivity
+        self.start = tuple(start)
+        self.goal = tuple(goal)
+
+        cells = self.width * self.height
+        self._blocked = memoryview(self.occupancy.reshape(-1))
+        self._g = memoryview(np.full(cells, np.inf))
+        self._rhs = memoryview(np.full(cells, np.inf))
+        self._moves = [(dx, dy, dx * self.height + dy, step) for dx, dy, step in MOVES[connectivity]]
+        # Heap entries are (k1, k2, index); `_open` holds each queued cell's live key
+        self._queue = []
+        self._open = {}
+        self._km = 0
+        self._last_start = self.start
+        self._pushed = 0
+        self._peak_open = 0
+        # Nothing has been searched yet; the first plan runs `_initial_search` instead of `_compute`
+        self._fresh = True
+
+        goal_index = cell_index(self.goal, self.height)
+        self._goal_index = goal_index
+        self._rhs[goal_index] = 0
+        self._push(goal_index)
+
+    def plan(self):
+        """Bring the search up to date and return a PlanResult from the current start."""
+        started = time.perf_counter()
+        pushed = self._pushed
+        self._peak_open = len(self._queue)
+        if self._fresh:
+            self._fresh = False
+            expanded = self._initial_search()
+        else:
+            expanded = self._compute()
+        start_index = cell_index(self.start, self.height)
+        cost = self._g[start_index]
+        path = None if cost == math.inf else self._extract_path(start_index)
+        stats = PlannerStats(expanded, self._pushed - pushed, 0, self._peak_open, time.perf_counter() - started)
+        return PlanResult(path, cost, stats)
+
+    def move_to(self, cell):
+        """Advance the start cell, e.g. as the patrol walks along its path."""
+        cell = tuple(cell)
+        self._km += grid_distance(cell[0] - self._last_start[0], cell[1] - self._last_start[1], self.connectivity)
+        self._last_start = cell
+        self.start = cell
+
+    def update_obstacles(self, added=(), removed=()):
+        """Apply obstacle deltas as iterables of (x, y) cells; `plan` then repairs the path."""
+        blocked = self._blocked
+        changed = []
+        for cells, value in ((added, 1), (removed, 0)):
+            for cell in cells:
+                index = cell_index(cell, self.height)
+                if blocked[index] != value:
+                    blocked[index] = value
+                    changed.append(index)
+
+        # Before the first search there are no distances to repair
+        if self._fresh:
+            return len(changed)
+        for index in changed:
+            self._update(index)
+            for neighbor in self._adjacent(index):
+                self._update(neighbor)
+        return len(changed)
+
+    def _heuristic(self, index):
+        x, y = index_cell(index, self.height)
+        return grid_distance(x - self.start[0], y - self.start[1], self.connectivity)
+
+    def _key(self, index):
+        best = min(self._g[index], self._rhs[index])
+        return best + self._heuristic(index) + self._km, best
+
+    def _push(self, index):
+        key = self._key(index)
+        self._open[index] = key
+        self._pushed += 1
+        heapq.heappush(self._queue, (key[0], key[1], index))
+        self._peak_open = max(self._peak_open, len(self._queue))
+
+    def _adjacent(self, index):
+        """In-bounds neighbor indices, blocked or not."""
+        x, y = index_cell(index, self.height)
+        for dx, dy, offset, _ in self._moves:
+            if 0 <= x + dx < self.width and 0 <= y + dy < self.height:
+                yield index + offset
+
+    def _edges(self, index):
+        """(neighbor, step cost) for every traversable move out of `index`."""
+        blocked = self._blocked
+        if blocked[index]:
+            return
+        x, y = index_cell(index, self.height)
+        for dx, dy, offset, step in self._moves:
+            if not (0 <= x + dx < self.width and 0 <= y + dy < self.height):
+                continue
+            neighbor = index + offset
+            if blocked[neighbor]:
+                continue
+            # Diagonal moves need both orthogonal cells free
+            if dx and dy and (blocked[index + dx * self.height] or blocked[index + dy]):
+                continue
+            yield neighbor, step
+
+    def _update(self, index):
+        g, rhs = self._g, self._rhs
+        if index != self._goal_index:
+            best = math.inf
+            for neighbor, step in self._edges(index):
+                if step + g[neighbor] < best:
+                    best = step + g[neighbor]
+            rhs[index] = best
+        if g[index] != rhs[index]:
+            self._push(index)
+        else:
+            self._open.pop(index, None)
+
+    def _initial_search(self):
+        """Backward A* from the goal, stopping where D* Lite's first `_compute` would; returns the expansions.
+
+        Cells it settles get their final g; cells it only reached keep their
+        best rhs and go on the D* Lite queue, so the result is the state
+        `_compute` would have left, reached without its per-neighbor `_update`.
+        """
+        g, rhs, blocked = self._g, self._rhs, self._blocked
+        width, height, moves = self.width, self.height, self._moves
+        start_x, start_y = self.start
+        start_index = cell_index(self.start, height)
+        octile = self.connectivity == 8
+        closed_array = np.zeros(width * height, dtype=np.uint8)
+        closed = memoryview(closed_array)
+        # Keys as in `_key`, less the uniform km offset: (rhs + h, rhs)
+        queue = [(rhs[self._goal_index] + self._heuristic(self._goal_index), rhs[self._goal_index], self._goal_index)]
+        pushed = peak_open = 1
+        expanded = 0
+
+        while queue:
+            k1, k2, index = queue[0]
+            if closed[index] or k2 > rhs[index]:
+                heapq.heappop(queue)
+                continue
+            start_key = rhs[start_index]
+            if closed[start_index] or start_key == math.inf:
+                if k1 > start_key + KEY_TOLERANCE or (k1 >= start_key - KEY_TOLERANCE and k2 > start_key + KEY_TOLERANCE):
+                    break
+            heapq.heappop(queue)
+            closed[index] = 1
+            g[index] = k2
+            expanded += 1
+            if blocked[index]:
+                continue
+
+            x, y = divmod(index, height)
+            for dx, dy, offset, step in moves:
+                if not (0 <= x + dx < width and 0 <= y + dy < height):
+                    continue
+                neighbor = index + offset
+                if blocked[neighbor] or closed[neighbor]:
+                    continue
+                if dx and dy and (blocked[index + dx * height] or blocked[index + dy]):
+                    continue
+                cost = k2 + step
+                if not cost < rhs[neighbor]:
+                    continue
+                rhs[neighbor] = cost
+                dx_start, dy_start = abs(x + dx - start_x), abs(y + dy - start_y)
+                if octile:
+                    h = max(dx_start, dy_start) + (SQRT2 - 1) * min(dx_start, dy_start)
+                else:
+                    h = dx_start + dy_start
+                heapq.heappush(queue, (cost + h, cost, neighbor))
+                pushed += 1
+                if len(queue) > peak_open:
+                    peak_open = len(queue)
+
+        # Reached but unsettled cells are exactly D* Lite's inconsistent ones
+        reached = np.isfinite(np.asarray(self._rhs)) & (closed_array == 0)
+        open_keys = self._open
+        open_keys.clear()
+        entries = []
+        for index in np.flatnonzero(reached).tolist():
+            key = self._key(index)
+            open_keys[index] = key
+            entries.append((key[0], key[1], index))
+        heapq.heapify(entries)
+        self._queue = entries
+        self._pushed += pushed
+        self._peak_open = max(self._peak_open, peak_open)
+        return expanded
+
+    def _compute(self):
+        g, rhs, queue, open_keys = self._g, self._rhs, self._queue, self._open
+        start_index = cell_index(self.start, self.height)
+        expanded = 0
+
+        while queue:
+            k1, k2, index = queue[0]
+            # Drop entries whose key was superseded or whose cell left the queue
+            if open_keys.get(index) != (k1, k2):
+                heapq.heappop(queue)
+                continue
+            start_k1, start_k2 = self._key(start_index)
+            if k1 > start_k1 + KEY_TOLERANCE or (k1 >= start_k1 - KEY_TOLERANCE and k2 > start_k2 + KEY_TOLERANCE):
+                if rhs[start_index] == g[start_index]:
+                    break
+
+            heapq.heappop(queue)
+            expanded += 1
+            new_key = self._key(index)
+            if (k1, k2) < new_key:
+                self._push(index)
+            elif g[index] > rhs[index]:
+                g[index] = rhs[index]
+                del open_keys[index]
+                for neighbor in self._adjacent(index):
+                    self._update(neighbor)
+            else:
+                g[index] = math.inf
+                self._update(index)
+                for neighbor in self._adjacent(index):
+                    self._update(neighbor)
+
+        return expanded
+
+    def _extract_path(self, index):
+        g = self._g
+        path = [index_cell(index, self.height)]
+        # Each step strictly lowers g, so a path can never revisit a cell
+        for _ in range(self.width * self.height):
+            if index == self._goal_index:
+                return path
+            best, best_cost = None, math.inf
+            for neighbor, step in self._edges(index):
+                if step + g[neighbor] < best_cost:
+                    best, best_cost = neighbor, step + g[neighbor]
+            if best is None:
+                return None
+            index = best
+            path.append(index_cell(index, self.height))
+        return None
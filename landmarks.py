@@ -0,0 +1,123 @@
+import hashlib
+import os
+
+import numpy as np
+
+from path_planner import cell_index, distance_field, grid_fingerprint
+
+DISTANCES_FILE = "distances.npy"
+META_FILE = "landmarks.npz"
+
+
+def map_fingerprint(occupancy, cost_map=None):
+    """`grid_fingerprint` extended with the cost raster, since landmark distances depend on both."""
+    fingerprint = grid_fingerprint(occupancy)
+    if cost_map is None:
+        return fingerprint
+    digest = hashlib.blake2b(fingerprint.encode(), digest_size=16)
+    digest.update(memoryview(np.ascontiguousarray(cost_map, dtype=np.float32).reshape(-1)))
+    return digest.hexdigest()
+
+
+def select_landmarks(occupancy, count, connectivity=4, cost_map=None):
+    """Pick `count` landmarks by farthest-point selection and return (cells, distance rows).
+
+    The first landmark is the free cell farthest from the first free cell;
+    each next one is the reachable cell farthest from all landmarks so far,
+    which spreads them towards the map's edges and dead ends where ALT
+    bounds are tightest. Rows are flat float32 distance fields.
+    """
+    height = occupancy.shape[1]
+    free_cells = np.flatnonzero(occupancy.reshape(-1) == 0)
+    if not free_cells.size:
+        raise ValueError("Cannot place landmarks on a fully blocked map")
+
+    seed = divmod(int(free_cells[0]), height)
+    nearest = distance_field(occupancy, [seed], connectivity, cost_map)
+    cells, rows = [], []
+    for _ in range(count):
+        candidates = np.where(np.isfinite(nearest), nearest, -1)
+        landmark = divmod(int(np.argmax(candidates)), height)
+        if landmark in cells:
+            break
+        row = distance_field(occupancy, [landmark], connectivity, cost_map)
+        cells.append(landmark)
+        rows.append(row)
+        nearest = row if len(rows) == 1 else np.minimum(nearest, row)
+    return cells, np.stack(rows)
+
+
+class LandmarkHeuristic:
+    """ALT (A*, landmarks, triangle inequality) lower bounds from precomputed distance fields.
+
+    For every landmark L, |d(L, goal) - d(L, v)| never exceeds the true cost
+    from v to goal. On uniform-cost grids distances are symmetric so both
+    sides of that bound hold; with a cost raster, entering costs make them
+    directional and only d(L, goal) - d(L, v) is used. Build once per map
+    with `build`, persist with `save`, and `load` memory-maps the distance
+    rows so large maps are paged in as queries touch them.
+    """
+    def __init__(self, landmarks, distances, shape, connectivity, fingerprint, directed):
+        self.landmarks = landmarks
+        self.distances = distances
+        self.shape = tuple(shape)
+        self.connectivity = connectivity
+        self.fingerprint = fingerprint
+        self.directed = directed
+
+    @classmethod
+    def build(cls, occupancy, count=8, connectivity=4, cost_map=None):
+        landmarks, distances = select_landmarks(occupancy, count, connectivity, cost_map)
+        fingerprint = map_fingerprint(occupancy, cost_map)
+        return cls(landmarks, distances, occupancy.shape, connectivity, fingerprint, cost_map is not None)
+
+    @classmethod
+    def load(cls, directory, occupancy, cost_map=None):
+        """Memory-map landmarks saved with `save`, checking they match the map."""
+        fingerprint = map_fingerprint(occupancy, cost_map)
+        with np.load(os.path.join(directory, META_FILE)) as data:
+            if str(data["fingerprint"]) != fingerprint:
+                raise ValueError(f"Landmarks in {directory} were built for a different map")
+            landmarks = [(int(x), int(y)) for x, y in data["landmarks"]]
+            connectivity = int(data["connectivity"])
+            directed = bool(data["directed"])
+        distances = np.load(os.path.join(directory, DISTANCES_FILE), mmap_mode="r")
+        return cls(landmarks, distances, occupancy.shape, connectivity, fingerprint, directed)
+
+    def save(self, directory):
+        """Write the distance rows as a raw .npy (so `load` can memory-map them) next to the metadata."""
+        os.makedirs(directory, exist_ok=True)
+        np.save(os.path.join(directory, DISTANCES_FILE), np.asarray(self.distances, dtype=np.float32))
+        np.savez(
+            os.path.join(directory, META_FILE),
+            landmarks=np.array(self.landmarks, dtype=np.int32).reshape(-1, 2),
+            connectivity=self.connectivity,
+            fingerprint=self.fingerprint,
+            directed=self.directed,
+        )
+
+    def estimator(self, goal):
+        """Return estimate(index), the landmark lower bound from a flat cell index to `goal`."""
+        goal_index = cell_index(goal, self.shape[1])
+        rows = [(memoryview(row), float(row[goal_index])) for row in self.distances]
+
+        # inf - inf comparisons are False, so landmarks that reach neither cell are ignored
+        if self.directed:
+            def estimate(index):
+                best = 0.0
+                for row, to_goal in rows:
+                    bound = to_goal - row[index]
+                    if bound > best:
+                        best = bound
+                return best
+        else:
+            def estimate(index):
+                best = 0.0
+                for row, to_goal in rows:
+                    bound = to_goal - row[index]
+                    if bound < 0:
+                        bound = -bound
+                    if bound > best:
+                        best = bound
+                return best
+        return estimate
@@ -0,0 +1,63 @@
+import numpy as np
+
+# Integer BT.601 luma weights for BGR frames, summing to 256
+LUMA_WEIGHTS = np.array([29, 150, 77], dtype=np.uint16)
+
+
+class MotionGate:
+    """Decide which frames of a mostly static feed need the detector.
+
+    Each frame is cut down to a grayscale thumbnail of every `stride`-th
+    pixel and compared with the thumbnail of the last frame sent to the
+    detector. The detector runs when more than `changed_fraction` of the
+    thumbnail moved by over `pixel_threshold` grey levels, and at least
+    every `max_skip` frames, which bounds how stale carried-forward boxes
+    can get. Comparing against the last inferred frame rather than the
+    previous one means slow changes still add up to a trigger.
+    """
+    def __init__(self, stride=8, pixel_threshold=25, changed_fraction=0.002, max_skip=30):
+        if stride < 1 or max_skip < 0:
+            raise ValueError(f"Need stride >= 1 and max_skip >= 0, got stride={stride}, max_skip={max_skip}")
+        self.stride = stride
+        self.pixel_threshold = pixel_threshold
+        self.changed_fraction = changed_fraction
+        self.max_skip = max_skip
+        self.frames = 0
+        self.triggered = 0
+        self.motion = 0.0
+        self._reference = None
+        self._skipped = 0
+
+    def thumbnail(self, frame):
+        """Strided grayscale copy of a BGR or grayscale frame, as int16 ready for differencing."""
+        sample = frame[::self.stride, ::self.stride]
+        if sample.ndim == 3:
+            sample = (sample[..., :3] @ LUMA_WEIGHTS) >> 8
+        return sample.astype(np.int16)
+
+    def check(self, frame):
+        """True if this frame should go to the detector; it then becomes the new reference."""
+        thumbnail = self.thumbnail(frame)
+        self.frames += 1
+        reference = self._reference
+        if reference is None or reference.shape != thumbnail.shape:
+            self.motion = 1.0
+        else:
+            self.motion = float((np.abs(thumbnail - reference) > self.pixel_threshold).mean())
+
+        if self.motion > self.changed_fraction or self._skipped >= self.max_skip:
+            self._reference = thumbnail
+            self._skipped = 0
+            self.triggered += 1
+            return True
+        self._skipped += 1
+        return False
+
+    def reset(self):
+        """Forget the reference so the next frame always triggers, e.g. after switching sources."""
+        self._reference = None
+        self._skipped = 0
+
+    @property
+    def skip_rate(self):
+        return 1 - self.triggered / self.frames if self.frames else 0.0
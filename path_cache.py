@@ -0,0 +1,184 @@
+import math
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+
+import numpy as np
+
+from path_planner import SQRT2, PlannerStats, PlanResult, grid_distance, grid_fingerprint, plan_path
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS paths (
+    fingerprint TEXT, mode TEXT, connectivity INTEGER,
+    start_x INTEGER, start_y INTEGER, goal_x INTEGER, goal_y INTEGER,
+    cost REAL, x0 INTEGER, y0 INTEGER, x1 INTEGER, y1 INTEGER, path BLOB,
+    PRIMARY KEY (fingerprint, mode, connectivity, start_x, start_y, goal_x, goal_y)
+)
+"""
+
+
+def search_region(start, goal, cost, connectivity, shape):
+    """Rectangle (x0, y0, x1, y1), end-exclusive, holding every cell of any route costing at most `cost`.
+
+    A cell outside the start/goal bounding box by `e` adds at least 2e
+    (4-connected) or 2(sqrt 2 - 1)e (8-connected) to the distance through it,
+    so cells beyond the slack cannot lie on a route as cheap as the cached one.
+    Obstacle changes outside the rectangle therefore cannot change the answer.
+    """
+    width, height = shape
+    if not math.isfinite(cost):
+        return 0, 0, width, height
+    slack = cost - grid_distance(start[0] - goal[0], start[1] - goal[1], connectivity)
+    growth = 2 if connectivity == 4 else 2 * (SQRT2 - 1)
+    margin = int(math.floor(slack / growth + 1e-9))
+    return (
+        max(0, min(start[0], goal[0]) - margin),
+        max(0, min(start[1], goal[1]) - margin),
+        min(width, max(start[0], goal[0]) + margin + 1),
+        min(height, max(start[1], goal[1]) + margin + 1),
+    )
+
+
+class PathCache:
+    """LRU cache of planned paths keyed by map fingerprint, planner settings and endpoints.
+
+    Hits are a dict lookup. With `db_path` every entry is also written to a
+    SQLite table and misses fall back to it, so a restarted process starts
+    warm. When obstacles change, `update_map` moves entries whose search
+    region is untouched over to the new map version and drops the rest.
+    """
+    def __init__(self, capacity=1024, db_path=None):
+        self.capacity = capacity
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self._db = None
+        if db_path is not None:
+            # Dash callbacks run on worker threads; all access goes through the lock
+            self._db = sqlite3.connect(db_path, check_same_thread=False)
+            self._db.execute(SCHEMA)
+            self._db.commit()
+
+    def plan(self, occupancy, start, goal, mode="astar", connectivity=4, fingerprint=None):
+        """`plan_path` through the cache. Pass `fingerprint` to skip hashing a map whose version is known."""
+        started = time.perf_counter()
+        fingerprint = fingerprint or grid_fingerprint(occupancy)
+        start, goal = tuple(int(v) for v in start), tuple(int(v) for v in goal)
+        entry = self.get(fingerprint, start, goal, mode, connectivity)
+        if entry is not None:
+            path, cost = entry
+            return PlanResult(path, cost, PlannerStats(wall_time=time.perf_counter() - started))
+
+        result = plan_path(occupancy, start, goal, mode, connectivity)
+        self.put(fingerprint, start, goal, mode, connectivity, result, occupancy.shape)
+        return result
+
+    def get(self, fingerprint, start, goal, mode="astar", connectivity=4):
+        """(path, cost) for a cached query, or None."""
+        key = (fingerprint, mode, connectivity, tuple(start), tuple(goal))
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+            elif self._db is not None:
+                row = self._db.execute(
+                    "SELECT cost, x0, y0, x1, y1, path FROM paths WHERE fingerprint = ? AND mode = ? "
+                    "AND connectivity = ? AND start_x = ? AND start_y = ? AND goal_x = ? AND goal_y = ?",
+                    (fingerprint, mode, connectivity, *start, *goal),
+                ).fetchone()
+                if row is not None:
+                    entry = (decode_path(row[5]), row[0], tuple(row[1:5]))
+                    self._remember(key, entry)
+            if entry is None:
+                self.misses += 1
+                return None
+            self.hits += 1
+        path, cost, _ = entry
+        return (None if path is None else list(path)), cost
+
+    def put(self, fingerprint, start, goal, mode, connectivity, result, shape):
+        """Store a PlanResult planned on a grid of `shape`."""
+        start, goal = tuple(start), tuple(goal)
+        region = search_region(start, goal, result.cost, connectivity, shape)
+        path = None if result.path is None else tuple(map(tuple, result.path))
+        key = (fingerprint, mode, connectivity, start, goal)
+        with self._lock:
+            self._remember(key, (path, result.cost, region))
+            if self._db is not None:
+                self._db.execute(
+                    "INSERT OR REPLACE INTO paths VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                    (fingerprint, mode, connectivity, *start, *goal, result.cost, *region, encode_path(path)),
+                )
+                self._db.commit()
+
+    def update_map(self, old_occupancy, new_occupancy):
+        """Carry entries over to an edited map, dropping those whose search region changed.
+
+        Returns (kept, dropped) entry counts. With a database every entry
+        lives in SQLite (memory holds a subset), so the counts are the rows
+        moved and deleted there; otherwise they count the in-memory entries.
+        """
+        old, new = grid_fingerprint(old_occupancy), grid_fingerprint(new_occupancy)
+        if old == new:
+            return 0, 0
+        changed = np.argwhere((old_occupancy != 0) != (new_occupancy != 0))
+
+        def untouched(region):
+            x0, y0, x1, y1 = region
+            inside = (changed[:, 0] >= x0) & (changed[:, 0] < x1) & (changed[:, 1] >= y0) & (changed[:, 1] < y1)
+            return not inside.any()
+
+        kept = dropped = 0
+        with self._lock:
+            for key in [key for key in self._entries if key[0] == old]:
+                entry = self._entries.pop(key)
+                if untouched(entry[2]):
+                    self._entries[(new,) + key[1:]] = entry
+                    kept += 1
+                else:
+                    dropped += 1
+
+            if self._db is not None:
+                rows = self._db.execute(
+                    "SELECT rowid, x0, y0, x1, y1 FROM paths WHERE fingerprint = ?", (old,)
+                ).fetchall()
+                stale = [(rowid,) for rowid, *region in rows if not untouched(region)]
+                dropped = self._db.executemany("DELETE FROM paths WHERE rowid = ?", stale).rowcount if stale else 0
+                kept = self._db.execute(
+                    "UPDATE OR REPLACE paths SET fingerprint = ? WHERE fingerprint = ?", (new, old)
+                ).rowcount
+                self._db.commit()
+        return kept, dropped
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            if self._db is not None:
+                self._db.execute("DELETE FROM paths")
+                self._db.commit()
+
+    def close(self):
+        if self._db is not None:
+            self._db.close()
+            self._db = None
+
+    def _remember(self, key, entry):
+        self._entries[key] = entry
+        self._entries.move_to_end(key)
+        if len(self._entries) > self.capacity:
+            self._entries.popitem(last=False)
+
+
+def encode_path(path):
+    """Pack a cell path as int32 bytes for SQLite; None stays NULL."""
+    if path is None:
+        return None
+    return np.asarray(path, dtype=np.int32).tobytes()
+
+
+def decode_path(blob):
+    if blob is None:
+        return None
+    return tuple(map(tuple, np.frombuffer(blob, dtype=np.int32).reshape(-1, 2).tolist()))
@@ -0,0 +1,943 @@
+import hashlib
+import heapq
+import math
+import time
+
+import numpy as np
+
+
+class Node:
+    """Represents a node in the grid, optionally at a time step for space-time plans."""
+    def __init__(self, x, y, cost=0, parent=None, time=0):
+        self.x = x
+        self.y = y
+        self.cost = cost
+        self.parent = parent
+        self.time = time
+
+    def __lt__(self, other):
+        return self.cost < other.cost
+
+
+def heuristic(node, goal):
+    """Heuristic function: Euclidean distance."""
+    return math.sqrt((node.x - goal.x) ** 2 + (node.y - goal.y) ** 2)
+
+
+def manhattan(node, goal):
+    """Heuristic function: Manhattan distance, exact on an empty 4-connected grid."""
+    return abs(node.x - goal.x) + abs(node.y - goal.y)
+
+
+def occupancy_grid(obstacles, grid_size):
+    """Build a uint8 occupancy array indexed [x, y] from a set of obstacle cells.
+
+    Cells outside the grid are dropped, as the set-based search ignores
+    them; negative indices would otherwise wrap onto the far edge.
+    """
+    occupancy = np.zeros(grid_size, dtype=np.uint8)
+    if obstacles:
+        cells = np.array(list(obstacles), dtype=np.int64).reshape(-1, 2)
+        inside = ((cells >= 0) & (cells < np.array(grid_size[:2]))).all(axis=1)
+        occupancy[cells[inside, 0], cells[inside, 1]] = 1
+    return occupancy
+
+
+def cell_index(cell, height):
+    """Flat int index of an (x, y) cell in a C-ordered grid with `height` columns."""
+    return cell[0] * height + cell[1]
+
+
+def index_cell(index, height):
+    """Inverse of `cell_index`."""
+    return divmod(int(index), height)
+
+
+def flat_occupancy(occupancy):
+    """Flat uint8 view of an occupancy array, copying only when the dtype needs it."""
+    if occupancy.dtype == np.bool_:
+        occupancy = occupancy.view(np.uint8)
+    elif occupancy.dtype != np.uint8:
+        occupancy = (occupancy != 0).view(np.uint8)
+    return np.ascontiguousarray(occupancy).reshape(-1)
+
+
+def grid_fingerprint(occupancy):
+    """Stable hash of an occupancy grid's shape and blocked cells."""
+    digest = hashlib.blake2b(digest_size=16)
+    digest.update(np.asarray(occupancy.shape, dtype=np.int64).tobytes())
+    digest.update(memoryview(flat_occupancy(occupancy)))
+    return digest.hexdigest()
+
+
+def reconstruct_indices(parents, index, height):
+    """Follow the flat parent array back from `index` and return the cell path."""
+    path = []
+    while index != -1:
+        path.append(index_cell(index, height))
+        index = parents[index]
+    return path[::-1]
+
+
+class PlannerStats:
+    """Search effort of one planner call.
+
+    `pushed` counts open-list insertions, `reopened` the pushes that lowered
+    the cost of a cell already on the open list, and `peak_open` the largest
+    the open list grew (stale entries included).
+    """
+    def __init__(self, expanded=0, pushed=0, reopened=0, peak_open=0, wall_time=0.0):
+        self.expanded = expanded
+        self.pushed = pushed
+        self.reopened = reopened
+        self.peak_open = peak_open
+        self.wall_time = wall_time
+
+    def merge(self, other):
+        """Fold the counters of a sub-search into these ones."""
+        self.expanded += other.expanded
+        self.pushed += other.pushed
+        self.reopened += other.reopened
+        self.peak_open = max(self.peak_open, other.peak_open)
+
+    def __repr__(self):
+        return (f"PlannerStats(expanded={self.expanded}, pushed={self.pushed}, reopened={self.reopened}, "
+                f"peak_open={self.peak_open}, wall_time={self.wall_time:.4f}s)")
+
+
+class PlanResult:
+    """Path returned by the planner together with its cost and search stats."""
+    def __init__(self, path, cost, stats):
+        self.path = path
+        self.cost = cost
+        self.stats = stats
+
+    @property
+    def expanded(self):
+        return self.stats.expanded
+
+    def __repr__(self):
+        length = len(self.path) if self.path else 0
+        return f"PlanResult(length={length}, cost={self.cost}, expanded={self.expanded})"
+
+
+def print_trace(event, cell, cost):
+    """Trace sink that prints every search step, for debugging small maps."""
+    if event == "expand":
+        print(f"Exploring Node: {cell}, Cost: {cost}")
+    elif event == "push":
+        print(f"Adding Node: {cell}, Cost: {cost}")
+    else:
+        print(f"Skipping Node: {cell}")
+
+
+SQRT2 = math.sqrt(2)
+
+# (dx, dy, step cost) for each connectivity; diagonals may not cut corners
+MOVES = {
+    4: [(-1, 0, 1), (1, 0, 1), (0, -1, 1), (0, 1, 1)],  # Up, Down, Left, Right
+    8: [(-1, 0, 1), (1, 0, 1), (0, -1, 1), (0, 1, 1),
+        (-1, -1, SQRT2), (-1, 1, SQRT2), (1, -1, SQRT2), (1, 1, SQRT2)],
+}
+
+
+def grid_distance(dx, dy, connectivity):
+    """Exact move cost across an empty grid: Manhattan for 4-, octile for 8-connectivity."""
+    dx, dy = abs(dx), abs(dy)
+    if connectivity == 4:
+        return dx + dy
+    return max(dx, dy) + (SQRT2 - 1) * min(dx, dy)
+
+
+def load_cost_map(path):
+    """Memory-map a float32 .npy cost raster so large sectors are paged in on demand.
+
+    The smallest cell cost is found once here and kept on the map as
+    `min_cost`, so searches do not scan the whole raster on every query.
+    """
+    cost_map = np.load(path, mmap_mode="r")
+    if cost_map.dtype != np.float32 or cost_map.ndim != 2:
+        raise ValueError(f"{path} is not a 2-D float32 cost raster")
+    cost_map.min_cost = min_cell_cost(cost_map)
+    return cost_map
+
+
+def save_cost_map(path, cost_map):
+    """Write a cost raster as float32 .npy, the format `load_cost_map` expects."""
+    np.save(path, np.asarray(cost_map, dtype=np.float32))
+
+
+def terrain_cost_map(elevation, vegetation=None, cell_size=1.0, slope_weight=10.0, vegetation_weight=2.0):
+    """Combine terrain layers into a float32 per-cell traversal cost.
+
+    Flat open ground costs 1. Slope (rise over run, from the elevation
+    gradient) and vegetation density in [0, 1] add `slope_weight` and
+    `vegetation_weight` per unit. Non-finite elevation marks impassable cells.
+    """
+    elevation = np.asarray(elevation, dtype=np.float32)
+    grad_x, grad_y = np.gradient(elevation, cell_size)
+    cost = 1.0 + slope_weight * np.hypot(grad_x, grad_y)
+    if vegetation is not None:
+        cost += vegetation_weight * np.asarray(vegetation, dtype=np.float32)
+    cost[~np.isfinite(cost)] = np.inf
+    return cost.astype(np.float32)
+
+
+def min_cell_cost(cost_map):
+    """Smallest traversal cost in the raster, used to keep the heuristic admissible.
+
+    Maps from `load_cost_map` carry it precomputed; other arrays are scanned.
+    """
+    min_cost = getattr(cost_map, "min_cost", None)
+    if min_cost is not None:
+        return min_cost
+    min_cost = float(np.nanmin(cost_map))
+    if not min_cost > 0:
+        raise ValueError("Cost map must be strictly positive")
+    return min_cost
+
+
+def terrain_view(cost_map, occupancy):
+    """Flat float32 memoryview over a cost raster; None for uniform cost."""
+    if cost_map is None:
+        return None
+    if cost_map.shape != occupancy.shape:
+        raise ValueError(f"Cost map shape {cost_map.shape} does not match grid {occupancy.shape}")
+    return memoryview(np.ascontiguousarray(cost_map, dtype=np.float32).reshape(-1))
+
+
+def terrain_costs(cost_map, occupancy):
+    """Flat memoryview over a cost raster and its heuristic scale; (None, 1) for uniform cost."""
+    if cost_map is None:
+        return None, 1
+    return terrain_view(cost_map, occupancy), min_cell_cost(cost_map)
+
+
+def astar_search(occupancy, start, goal, connectivity=4, cost_map=None, trace=None, landmarks=None):
+    """A* on a NumPy occupancy grid.
+
+    `occupancy` is a bool/uint8 array indexed [x, y] where non-zero cells are
+    blocked; `start` and `goal` are (x, y) tuples. Search state lives in flat
+    arrays (float32 g-scores, int32 parents, uint8 closed flags), a few bytes per
+    cell, and the open list is a heap of flat indices with lazy deletion.
+
+    With a float32 `cost_map` of the same shape, entering a cell costs its
+    raster value times the step length, and the heuristic is scaled by the
+    cheapest cell so it stays admissible. Non-finite costs are impassable.
+
+    `landmarks` (see `landmarks.LandmarkHeuristic`) tightens the heuristic
+    with precomputed landmark distances; the larger of the two bounds is used.
+
+    `trace`, if given, is called as trace(event, cell, cost) for every
+    "expand", "push" and "skip" step; without it the loop only bumps counters.
+    """
+    started = time.perf_counter()
+    tracing = trace is not None
+    estimate = None if landmarks is None else landmarks.estimator(goal)
+    width, height = occupancy.shape
+    cells = width * height
+    goal_x, goal_y = goal
+    goal_index = cell_index(goal, height)
+    start_index = cell_index(start, height)
+
+    # memoryviews over the NumPy buffers keep per-cell reads free of scalar boxing
+    blocked = memoryview(flat_occupancy(occupancy))
+    g_array = np.full(cells, np.inf, dtype=np.float32)
+    parent_array = np.full(cells, -1, dtype=np.int32)
+    closed_array = np.zeros(cells, dtype=np.uint8)
+    g_score = memoryview(g_array)
+    parents = memoryview(parent_array)
+    closed = memoryview(closed_array)
+
+    terrain, scale = terrain_costs(cost_map, occupancy)
+    g_score[start_index] = 0
+    moves = [(dx, dy, dx * height + dy, step) for dx, dy, step in MOVES[connectivity]]
+    expanded = pushed = reopened = 0
+    peak_open = 1
+    # Entries are (f, -g, index): ties on f prefer the deeper node.
+    open_list = [(scale * grid_distance(start[0] - goal_x, start[1] - goal_y, connectivity), 0, start_index)]
+
+    while open_list:
+        _, neg_g, index = heapq.heappop(open_list)
+
+        # Skip entries superseded by a cheaper push of the same cell
+        if closed[index]:
+            continue
+        closed[index] = 1
+        expanded += 1
+        x, y = divmod(index, height)
+        if tracing:
+            trace("expand", (x, y), -neg_g)
+
+        if index == goal_index:
+            path = reconstruct_indices(parents, index, height)
+            stats = PlannerStats(expanded, pushed, reopened, peak_open, time.perf_counter() - started)
+            return PlanResult(path, -neg_g, stats)
+
+        # Explore neighbors
+        for dx, dy, offset, step in moves:
+            neighbor_x, neighbor_y = x + dx, y + dy
+
+            # Skip out-of-bounds neighbors
+            if not (0 <= neighbor_x < width and 0 <= neighbor_y < height):
+                continue
+
+            neighbor = index + offset
+            if blocked[neighbor] or closed[neighbor]:
+                if tracing:
+                    trace("skip", (neighbor_x, neighbor_y), None)
+                continue
+
+            # Diagonal moves need both orthogonal cells free
+            if dx and dy and (blocked[index + dx * height] or blocked[index + dy]):
+                if tracing:
+                    trace("skip", (neighbor_x, neighbor_y), None)
+                continue
+
+            # Only push when this is the cheapest route found to the neighbor
+            if terrain is None:
+                neighbor_g = step - neg_g
+            else:
+                neighbor_g = step * terrain[neighbor] - neg_g
+            # Written as `not <` so infinite and NaN terrain costs are skipped too
+            if not neighbor_g < g_score[neighbor]:
+                if tracing:
+                    trace("skip", (neighbor_x, neighbor_y), neighbor_g)
+                continue
+
+            if g_score[neighbor] != math.inf:
+                reopened += 1
+            g_score[neighbor] = neighbor_g
+            parents[neighbor] = index
+            neighbor_f = neighbor_g + scale * grid_distance(neighbor_x - goal_x, neighbor_y - goal_y, connectivity)
+            if estimate is not None:
+                landmark_f = neighbor_g + estimate(neighbor)
+                if landmark_f > neighbor_f:
+                    neighbor_f = landmark_f
+            heapq.heappush(open_list, (neighbor_f, -neighbor_g, neighbor))
+            pushed += 1
+            if len(open_list) > peak_open:
+                peak_open = len(open_list)
+            if tracing:
+                trace("push", (neighbor_x, neighbor_y), neighbor_g)
+
+    stats = PlannerStats(expanded, pushed, reopened, peak_open, time.perf_counter() - started)
+    return PlanResult(None, math.inf, stats)
+
+
+def bidirectional_search(occupancy, start, goal, connectivity=4, cost_map=None, trace=None):
+    """A* from both ends at once, on the same grids and cost rasters as `astar_search`.
+
+    Both sides order their open lists by max(f, 2g) and each step expands
+    the side with the smaller head, so neither search runs much past half
+    the route cost and they meet in the middle (the MM algorithm). The best
+    meeting cost seen so far is kept and a node whose f already reaches it
+    is never pushed. The search stops once that cost is no more than the
+    smaller head, or the smallest g of the two open lists plus one step:
+    no unexplored route can then be cheaper, so the path is optimal.
+    `trace` works as in `astar_search`, with steps from both sides
+    interleaved.
+    """
+    started = time.perf_counter()
+    tracing = trace is not None
+    width, height = occupancy.shape
+    cells = width * height
+    blocked = memoryview(flat_occupancy(occupancy))
+    terrain, scale = terrain_costs(cost_map, occupancy)
+    moves = [(dx, dy, dx * height + dy, step) for dx, dy, step in MOVES[connectivity]]
+    start_index = cell_index(start, height)
+    goal_index = cell_index(goal, height)
+    # Like `astar_search`, never step onto a blocked goal; seeding the backward search there would
+    if blocked[goal_index] and start_index != goal_index:
+        return PlanResult(None, math.inf, PlannerStats(0, 0, 0, 0, time.perf_counter() - started))
+
+    # Index 0 is the forward search from start, 1 the backward search from goal
+    g_arrays = [np.full(cells, np.inf, dtype=np.float32) for _ in range(2)]
+    parent_arrays = [np.full(cells, -1, dtype=np.int32) for _ in range(2)]
+    closed_arrays = [np.zeros(cells, dtype=np.uint8) for _ in range(2)]
+    g_score = [memoryview(array) for array in g_arrays]
+    parents = [memoryview(array) for array in parent_arrays]
+    closed = [memoryview(array) for array in closed_arrays]
+    targets = [goal, start]
+
+    g_score[0][start_index] = 0
+    g_score[1][goal_index] = 0
+    first_f = scale * grid_distance(start[0] - goal[0], start[1] - goal[1], connectivity)
+    open_lists = [[(first_f, 0, start_index)], [(first_f, 0, goal_index)]]
+    # The open nodes again, keyed by g, for the bound g_min_forward + g_min_backward + cheapest step.
+    # The bound is useless until the sides meet, so these heaps are only built then.
+    g_lists = None
+    best = 0 if start_index == goal_index else math.inf
+    meet = start_index if start_index == goal_index else -1
+    expanded = pushed = reopened = 0
+    peak_open = 2
+
+    # Superseded entries stay in the heaps but are never smaller than the live entry of their node, and
+    # closed heads are dropped after each expansion, so every head is a lower bound on its open nodes
+    while open_lists[0] and open_lists[1]:
+        side = 0 if open_lists[0][0][0] <= open_lists[1][0][0] else 1
+        if best <= open_lists[side][0][0]:
+            break
+        if best != math.inf:
+            if g_lists is None:
+                g_lists = []
+                for open_list, side_closed in zip(open_lists, closed):
+                    g_list = [(-neg_g, index) for _, neg_g, index in open_list if not side_closed[index]]
+                    heapq.heapify(g_list)
+                    g_lists.append(g_list)
+            if best <= g_lists[0][0][0] + g_lists[1][0][0] + scale:
+                break
+
+        open_list, side_closed = open_lists[side], closed[side]
+        g_list = g_lists[side] if g_lists is not None else None
+        g_side, g_other = g_score[side], g_score[1 - side]
+        target_x, target_y = targets[side]
+        _, neg_g, index = heapq.heappop(open_list)
+        side_closed[index] = 1
+        expanded += 1
+
+        x, y = divmod(index, height)
+        if tracing:
+            trace("expand", (x, y), -neg_g)
+        for dx, dy, offset, step in moves:
+            neighbor_x, neighbor_y = x + dx, y + dy
+            if not (0 <= neighbor_x < width and 0 <= neighbor_y < height):
+                continue
+            neighbor = index + offset
+            if blocked[neighbor] or side_closed[neighbor]:
+                if tracing:
+                    trace("skip", (neighbor_x, neighbor_y), None)
+                continue
+            if dx and dy and (blocked[index + dx * height] or blocked[index + dy]):
+                if tracing:
+                    trace("skip", (neighbor_x, neighbor_y), None)
+                continue
+
+            # Entering a cell costs its raster value, so the backward search
+            # pays for the cell it is leaving
+            if terrain is None:
+                edge = step
+            else:
+                edge = step * terrain[neighbor if side == 0 else index]
+            neighbor_g = edge - neg_g
+            if not neighbor_g < g_side[neighbor]:
+                if tracing:
+                    trace("skip", (neighbor_x, neighbor_y), neighbor_g)
+                continue
+
+            if g_side[neighbor] != math.inf:
+                reopened += 1
+            g_side[neighbor] = neighbor_g
+            parents[side][neighbor] = index
+            if neighbor_g + g_other[neighbor] < best:
+                best = neighbor_g + g_other[neighbor]
+                meet = neighbor
+            neighbor_f = neighbor_g + scale * grid_distance(neighbor_x - target_x, neighbor_y - target_y, connectivity)
+            if neighbor_f >= best:
+                # Cannot lead to a cheaper meeting; its g still counts when the other side reaches it
+                if tracing:
+                    trace("skip", (neighbor_x, neighbor_y), neighbor_g)
+                continue
+            heapq.heappush(open_list, (max(neighbor_f, 2 * neighbor_g), -neighbor_g, neighbor))
+            if g_list is not None:
+                heapq.heappush(g_list, (neighbor_g, neighbor))
+            pushed += 1
+            if len(open_lists[0]) + len(open_lists[1]) > peak_open:
+                peak_open = len(open_lists[0]) + len(open_lists[1])
+            if tracing:
+                trace("push", (neighbor_x, neighbor_y), neighbor_g)
+
+        while open_list and side_closed[open_list[0][2]]:
+            heapq.heappop(open_list)
+        while g_list and side_closed[g_list[0][1]]:
+            heapq.heappop(g_list)
+
+    stats = PlannerStats(expanded, pushed, reopened, peak_open)
+    if meet == -1:
+        path = None
+    else:
+        forward = reconstruct_indices(parents[0], meet, height)
+        backward = reconstruct_indices(parents[1], meet, height)
+        path = forward + backward[-2::-1]
+    stats.wall_time = time.perf_counter() - started
+    return PlanResult(path, best, stats)
+
+
+def bfs_distances(occupancy, seeds, targets, parents=None):
+    """Unit-cost 4-connected distances from the nearest seed cell to each target, by breadth-first layers.
+
+    Each layer is expanded with NumPy array operations over the whole
+    frontier, so the Python loop runs once per distance step, not per cell.
+    If `parents` (a flat int32 array, one slot per cell) is given it is filled
+    with the search tree, -1 at the seeds and at unreached cells.
+    """
+    height = occupancy.shape[1]
+    target_indices = np.array([cell_index(target, height) for target in targets], dtype=np.int64)
+    dist = bfs_field(occupancy, seeds, target_indices, parents)
+    return [float(value) for value in dist[target_indices]]
+
+
+def bfs_field(occupancy, seeds, target_indices=None, parents=None, connectivity=4):
+    """Flat float32 BFS step counts, run until `target_indices` are reached or, if None, over the whole grid.
+
+    With connectivity 8 every move, diagonal included, counts as one step.
+    """
+    width, height = occupancy.shape
+    free = flat_occupancy(occupancy) == 0
+    dist = np.full(width * height, np.inf, dtype=np.float32)
+    if parents is not None:
+        parents[...] = -1
+
+    frontier = np.unique(np.array([cell_index(seed, height) for seed in seeds], dtype=np.int64))
+    dist[frontier] = 0
+    step = 0
+    while frontier.size and (target_indices is None or not np.isfinite(dist[target_indices]).all()):
+        step += 1
+        x, y = np.divmod(frontier, height)
+        # In-bounds masks per direction, indexed by dx + 1 and dy + 1
+        x_ok = (x > 0, None, x < width - 1)
+        y_ok = (y > 0, None, y < height - 1)
+        origins, candidates = [], []
+        for dx, dy, _ in MOVES[connectivity]:
+            if not dy:
+                source = frontier[x_ok[dx + 1]]
+            elif not dx:
+                source = frontier[y_ok[dy + 1]]
+            else:
+                source = frontier[x_ok[dx + 1] & y_ok[dy + 1]]
+            if dx and dy:
+                # Diagonal moves need both orthogonal cells free
+                source = source[free[source + dx * height] & free[source + dy]]
+            origins.append(source)
+            candidates.append(source + (dx * height + dy))
+        origins = np.concatenate(origins)
+        candidates = np.concatenate(candidates)
+        reached = free[candidates] & np.isinf(dist[candidates])
+        frontier, first = np.unique(candidates[reached], return_index=True)
+        dist[frontier] = step
+        if parents is not None:
+            parents[frontier] = origins[reached][first]
+
+    return dist
+
+
+def bfs_fields(occupancy, seeds, target_indices, connectivity=4):
+    """Separate BFS step counts from each seed cell, as a (len(seeds), cells) float32 array.
+
+    Row i is what `bfs_field(occupancy, [seeds[i]], [target_indices[i]])`
+    returns, but all searches advance together, one layer of every row
+    per NumPy pass, so many short searches cost little more in Python
+    overhead than the longest one. A row stops growing once its target
+    is reached.
+    """
+    width, height = occupancy.shape
+    # Work on grids padded with a blocked border, stacked one per row: a neighbor offset never leaves
+    # its row, and NaN marks blocked cells so one read tells free-and-unvisited (inf) apart
+    padded_height = height + 2
+    padded_cells = (width + 2) * padded_height
+    count = len(seeds)
+    dist = np.full((count, width + 2, padded_height), np.nan, dtype=np.float32)
+    dist[:, 1:-1, 1:-1] = np.where(np.asarray(occupancy) != 0, np.nan, np.inf)
+    flat = dist.reshape(-1)
+    row_starts = np.arange(count, dtype=np.int64) * padded_cells
+
+    def padded(indices):
+        x, y = np.divmod(np.asarray(indices, dtype=np.int64), height)
+        return (x + 1) * padded_height + y + 1
+
+    targets = row_starts + padded(target_indices)
+    frontier = row_starts + padded([cell_index(seed, height) for seed in seeds])
+    flat[frontier] = 0
+    moves = [(dx, dy, dx * padded_height + dy) for dx, dy, _ in MOVES[connectivity]]
+    finished = 0
+    step = 0
+    while frontier.size:
+        done = np.isfinite(flat[targets])
+        if done.sum() > finished:
+            if done.all():
+                break
+            finished = done.sum()
+            frontier = frontier[~done[frontier // padded_cells]]
+        step += 1
+        candidates = []
+        for dx, dy, offset in moves:
+            if dx and dy:
+                # Diagonal moves need both orthogonal cells free
+                source = frontier[~np.isnan(flat[frontier + dx * padded_height]) & ~np.isnan(flat[frontier + dy])]
+                candidates.append(source + offset)
+            else:
+                candidates.append(frontier + offset)
+        candidates = np.concatenate(candidates)
+        candidates = candidates[np.isinf(flat[candidates])]
+        # Dedup without sorting: every candidate writes its own negative ticket into the cell and the
+        # one whose ticket survived keeps the cell
+        tickets = -1 - np.arange(candidates.size, dtype=np.float32)
+        flat[candidates] = tickets
+        frontier = candidates[flat[candidates] == tickets]
+        flat[frontier] = step
+
+    dist = dist[:, 1:-1, 1:-1].reshape(count, width * height)
+    dist[np.isnan(dist)] = np.inf
+    return dist
+
+
+def dijkstra_distances(occupancy, seeds, targets, connectivity=4, cost_map=None, parents=None):
+    """Dijkstra from the seed cells until every reachable target is settled.
+
+    Returns path costs from the nearest seed to each target, math.inf where a
+    target cannot be reached; `parents` is filled as in `bfs_distances`.
+    """
+    height = occupancy.shape[1]
+    target_indices = [cell_index(target, height) for target in targets]
+    dist = dijkstra_field(occupancy, seeds, connectivity, cost_map, target_indices, parents)
+    return [float(dist[index]) for index in target_indices]
+
+
+def dijkstra_field(occupancy, seeds, connectivity=4, cost_map=None, target_indices=None, parents=None):
+    """Flat float32 Dijkstra costs, run until `target_indices` are settled or, if None, over the whole grid.
+
+    Cells left unsettled when the search stops hold math.inf.
+    """
+    width, height = occupancy.shape
+    cells = width * height
+    blocked = memoryview(flat_occupancy(occupancy))
+    terrain = terrain_view(cost_map, occupancy)
+    dist_array = np.full(cells, np.inf, dtype=np.float32)
+    closed_array = np.zeros(cells, dtype=np.uint8)
+    dist = memoryview(dist_array)
+    closed = memoryview(closed_array)
+    if parents is not None:
+        parents[...] = -1
+        tree = memoryview(parents)
+    moves = [(dx, dy, dx * height + dy, step) for dx, dy, step in MOVES[connectivity]]
+
+    pending = None if target_indices is None else set(target_indices)
+    open_list = []
+    for seed in seeds:
+        seed_index = cell_index(seed, height)
+        dist[seed_index] = 0
+        open_list.append((0, seed_index))
+
+    while open_list and (pending is None or pending):
+        cost, index = heapq.heappop(open_list)
+        if closed[index]:
+            continue
+        closed[index] = 1
+        if pending is not None:
+            pending.discard(index)
+
+        x, y = divmod(index, height)
+        for dx, dy, offset, step in moves:
+            if not (0 <= x + dx < width and 0 <= y + dy < height):
+                continue
+            neighbor = index + offset
+            if blocked[neighbor] or closed[neighbor]:
+                continue
+            if dx and dy and (blocked[index + dx * height] or blocked[index + dy]):
+                continue
+            neighbor_cost = cost + (step if terrain is None else step * terrain[neighbor])
+            if not neighbor_cost < dist[neighbor]:
+                continue
+            dist[neighbor] = neighbor_cost
+            if parents is not None:
+                tree[neighbor] = index
+            heapq.heappush(open_list, (neighbor_cost, neighbor))
+
+    # Tentative costs of cells still on the open list are not final
+    dist_array[closed_array == 0] = np.inf
+    return dist_array
+
+
+def multi_source_search(occupancy, sources, targets, connectivity=4, cost_map=None, parents=None):
+    """Costs from the nearest of several `sources` to each target, in a single search.
+
+    Uniform-cost 4-connected grids take the vectorized `bfs_distances` path;
+    everything else runs `dijkstra_distances`.
+    """
+    if connectivity == 4 and cost_map is None:
+        return bfs_distances(occupancy, sources, targets, parents)
+    return dijkstra_distances(occupancy, sources, targets, connectivity, cost_map, parents)
+
+
+def distance_field(occupancy, seeds, connectivity=4, cost_map=None):
+    """Cost from the nearest seed to every cell, as a flat float32 array with math.inf where unreachable."""
+    if connectivity == 4 and cost_map is None:
+        return bfs_field(occupancy, seeds)
+    return dijkstra_field(occupancy, seeds, connectivity, cost_map)
+
+
+def multi_goal_search(occupancy, source, targets, connectivity=4, cost_map=None, parents=None):
+    """Costs from `source` to each of `targets`, math.inf where unreachable.
+
+    One call replaces a separate A* per target; pass a flat int32 `parents`
+    array to keep the search tree for `reconstruct_indices`.
+    """
+    return multi_source_search(occupancy, [source], targets, connectivity, cost_map, parents)
+
+
+def straight_jump_reach(occupancy):
+    """Per straight direction (dx, dy), where a JPS scan would find a jump point.
+
+    Each value is a flat bool array over the grid padded by one blocked
+    cell on every side, indexed (x + 1) * (height + 2) + y + 1, so a
+    neighbor's entry needs no bounds check. It is True where a scan
+    starting at that cell reaches a forced neighbor before a wall. One pass
+    per direction over the rows or columns fills it; the goal is not
+    included.
+    """
+    free = np.pad(flat_occupancy(occupancy).reshape(occupancy.shape) == 0, 1)
+    reach = {}
+    for dx, dy in ((1, 0), (-1, 0), (0, 1), (0, -1)):
+        # Scan along the first axis: rows for dx, the transposed grid's rows for dy
+        lines = free if dx else free.T
+        step = dx or dy
+        found = np.zeros_like(lines)
+        count = lines.shape[0] - 2
+        for x in (range(count, 0, -1) if step > 0 else range(1, count + 1)):
+            side = lines[x, :-2] & ~lines[x - step, :-2] | lines[x, 2:] & ~lines[x - step, 2:]
+            found[x, 1:-1] = lines[x, 1:-1] & (side | found[x + step, 1:-1])
+        reach[(dx, dy)] = (found if dx else found.T).reshape(-1)
+    return reach
+
+
+def row_jump_stops(occupancy):
+    """Flat bool array marking where a 4-connected JPS run along y must stop.
+
+    A run stops at a cell when a scan along x from either neighbor would
+    reach a forced neighbor before a wall, which `straight_jump_reach`
+    answers for every cell at once, replacing the two scans each step
+    would otherwise start. The goal is not included.
+    """
+    width, height = occupancy.shape
+    reach = straight_jump_reach(occupancy)
+    ahead = reach[(1, 0)].reshape(width + 2, height + 2)
+    behind = reach[(-1, 0)].reshape(width + 2, height + 2)
+    return (ahead[2:, 1:-1] | behind[:-2, 1:-1]).reshape(-1)
+
+
+def jps_search(occupancy, start, goal, connectivity=4, trace=None):
+    """Jump Point Search on a uniform-cost NumPy occupancy grid.
+
+    Straight (and, with 8-connectivity, diagonal) runs are scanned without
+    touching the open list; only jump points - cells with a forced neighbor or a
+    line of sight to one - are pushed. Paths have the same cost as
+    `astar_search` with the same connectivity. Jump points are sparse, so their
+    g-scores and parents are kept in dicts rather than full-grid arrays.
+    """
+    width, height = occupancy.shape
+    blocked = memoryview(flat_occupancy(occupancy))
+    goal_x, goal_y = goal
+    if connectivity == 4:
+        stops = row_jump_stops(occupancy)
+    else:
+        reach = straight_jump_reach(occupancy)
+        padded_height = height + 2
+
+    def free(x, y):
+        return 0 <= x < width and 0 <= y < height and not blocked[x * height + y]
+
+    def jump4(x, y, dx, dy):
+        # Scan from (x, y) in direction (dx, dy) until a jump point or a wall
+        while free(x, y):
+            if x == goal_x and y == goal_y:
+                return x, y
+            if dx:
+                if (free(x, y - 1) and not free(x - dx, y - 1)) or (free(x, y + 1) and not free(x - dx, y + 1)):
+                    return x, y
+            else:
+                if (free(x - 1, y) and not free(x - 1, y - dy)) or (free(x + 1, y) and not free(x + 1, y - dy)):
+                    return x, y
+                # Vertical runs stop wherever a horizontal scan would find something;
+                # only the goal's column still needs the scans themselves
+                if stops[x * height + y] or (y == goal_y and (jump4(x + 1, y, 1, 0) or jump4(x - 1, y, -1, 0))):
+                    return x, y
+            x += dx
+            y += dy
+        return None
+
+    def jump8(x, y, dx, dy):
+        while free(x, y):
+            if x == goal_x and y == goal_y:
+                return x, y
+            if dx and dy:
+                # Diagonal runs stop wherever a straight scan would find something; only scans along the
+                # goal's row or column still run, so the goal is found
+                if (reach[(dx, 0)][(x + dx + 1) * padded_height + y + 1]
+                        or reach[(0, dy)][(x + 1) * padded_height + y + dy + 1]
+                        or (y == goal_y and jump8(x + dx, y, dx, 0)) or (x == goal_x and jump8(x, y + dy, 0, dy))):
+                    return x, y
+            elif dx:
+                if (free(x, y - 1) and not free(x - dx, y - 1)) or (free(x, y + 1) and not free(x - dx, y + 1)):
+                    return x, y
+            else:
+                if (free(x - 1, y) and not free(x - 1, y - dy)) or (free(x + 1, y) and not free(x + 1, y - dy)):
+                    return x, y
+            # No corner cutting on the next step
+            if not (free(x + dx, y) and free(x, y + dy)):
+                return None
+            x += dx
+            y += dy
+        return None
+
+    def directions4(x, y, dx, dy):
+        if dx:
+            return [(0, -1), (0, 1), (dx, 0)]
+        return [(-1, 0), (1, 0), (0, dy)]
+
+    def directions8(x, y, dx, dy):
+        if dx and dy:
+            side_x, side_y = free(x + dx, y), free(x, y + dy)
+            directions = []
+            if side_y:
+                directions.append((0, dy))
+            if side_x:
+                directions.append((dx, 0))
+            if side_x and side_y:
+                directions.append((dx, dy))
+            return directions
+        if dx:
+            ahead, left, right = free(x + dx, y), free(x, y - 1), free(x, y + 1)
+        else:
+            ahead, left, right = free(x, y + dy), free(x - 1, y), free(x + 1, y)
+        directions = []
+        for side, clear in ((-1, left), (1, right)):
+            if not clear:
+                continue
+            directions.append((side, 0) if dy else (0, side))
+            if ahead:
+                directions.append((side, dy) if dy else (dx, side))
+        if ahead:
+            directions.append((dx, dy))
+        return directions
+
+    if connectivity == 4:
+        jump, directions = jump4, directions4
+    else:
+        jump, directions = jump8, directions8
+
+    started = time.perf_counter()
+    tracing = trace is not None
+    best_g = {start: 0}
+    parents = {start: None}
+    closed = set()
+    expanded = pushed = reopened = 0
+    peak_open = 1
+    open_list = [(grid_distance(start[0] - goal_x, start[1] - goal_y, connectivity), 0, start)]
+
+    while open_list:
+        _, neg_g, cell = heapq.heappop(open_list)
+        if cell in closed:
+            continue
+        closed.add(cell)
+        expanded += 1
+        if tracing:
+            trace("expand", cell, -neg_g)
+
+        if cell == goal:
+            path = expand_jump_points(parents, cell)
+            stats = PlannerStats(expanded, pushed, reopened, peak_open, time.perf_counter() - started)
+            return PlanResult(path, -neg_g, stats)
+
+        x, y = cell
+        parent = parents[cell]
+        if parent is None:
+            candidates = [(dx, dy) for dx, dy, _ in MOVES[connectivity]
+                          if free(x + dx, y + dy) and (not (dx and dy) or (free(x + dx, y) and free(x, y + dy)))]
+        else:
+            candidates = directions(x, y, sign(x - parent[0]), sign(y - parent[1]))
+
+        for dx, dy in candidates:
+            jump_point = jump(x + dx, y + dy, dx, dy)
+            if jump_point is None or jump_point in closed:
+                continue
+            jump_g = grid_distance(jump_point[0] - x, jump_point[1] - y, connectivity) - neg_g
+            if jump_g >= best_g.get(jump_point, math.inf):
+                if tracing:
+                    trace("skip", jump_point, jump_g)
+                continue
+            if jump_point in best_g:
+                reopened += 1
+            best_g[jump_point] = jump_g
+            parents[jump_point] = cell
+            jump_f = jump_g + grid_distance(jump_point[0] - goal_x, jump_point[1] - goal_y, connectivity)
+            heapq.heappush(open_list, (jump_f, -jump_g, jump_point))
+            pushed += 1
+            if len(open_list) > peak_open:
+                peak_open = len(open_list)
+            if tracing:
+                trace("push", jump_point, jump_g)
+
+    stats = PlannerStats(expanded, pushed, reopened, peak_open, time.perf_counter() - started)
+    return PlanResult(None, math.inf, stats)
+
+
+def sign(value):
+    return (value > 0) - (value < 0)
+
+
+def expand_jump_points(parents, cell):
+    """Turn a chain of jump points into the full cell-by-cell path."""
+    jump_points = []
+    while cell is not None:
+        jump_points.append(cell)
+        cell = parents[cell]
+    jump_points.reverse()
+
+    path = [jump_points[0]]
+    for (x, y), (next_x, next_y) in zip(jump_points, jump_points[1:]):
+        dx, dy = sign(next_x - x), sign(next_y - y)
+        while (x, y) != (next_x, next_y):
+            x, y = x + dx, y + dy
+            path.append((x, y))
+    return path
+
+
+def plan_path(occupancy, start, goal, mode="astar", connectivity=4, cost_map=None, trace=None, landmarks=None):
+    """Plan a route on an occupancy grid and return a PlanResult.
+
+    `mode` is "astar", "bidirectional" or "jps"; `connectivity` is 4 or 8.
+    `cost_map` is an optional float32 terrain raster (see `load_cost_map`);
+    JPS needs uniform cost and rejects it. `trace` is an optional step sink
+    such as `print_trace`; the result's `stats` are filled in either way.
+    `landmarks` switches A* to the ALT heuristic and must have been built
+    for the same map, connectivity and cost raster.
+    """
+    if connectivity not in MOVES:
+        raise ValueError(f"connectivity must be 4 or 8, got {connectivity}")
+    if landmarks is not None:
+        if mode != "astar":
+            raise ValueError(f"Landmark heuristics are only supported in astar mode, got {mode}")
+        if landmarks.connectivity != connectivity:
+            raise ValueError(f"Landmarks were built for connectivity {landmarks.connectivity}, not {connectivity}")
+        if landmarks.shape != occupancy.shape:
+            raise ValueError(f"Landmarks were built for a {landmarks.shape} grid, not {occupancy.shape}")
+        if landmarks.directed != (cost_map is not None):
+            built_for = "a cost map" if landmarks.directed else "uniform cost"
+            raise ValueError(f"Landmarks were built for {built_for}, which does not match the cost_map argument")
+    if mode == "astar":
+        return astar_search(occupancy, start, goal, connectivity, cost_map, trace, landmarks)
+    if mode == "bidirectional":
+        return bidirectional_search(occupancy, start, goal, connectivity, cost_map, trace)
+    if mode == "jps":
+        if cost_map is not None:
+            raise ValueError("Jump Point Search only supports uniform-cost grids")
+        return jps_search(occupancy, start, goal, connectivity, trace)
+    raise ValueError(f"Unknown planner mode: {mode}")
+
+
+def a_star_grid(occupancy, start, goal, mode="astar", connectivity=4, cost_map=None, trace=None):
+    """A* path between two (x, y) cells on an occupancy grid, or None."""
+    return plan_path(occupancy, start, goal, mode, connectivity, cost_map, trace).path
+
+
+def a_star(start, goal, obstacles, grid_size, mode="astar", connectivity=4, cost_map=None, trace=None):
+    """A* pathfinding between two Nodes.
+
+    `obstacles` is either a set of (x, y) cells or an occupancy array of shape
+    `grid_size`; sets are rasterised once and the search runs on `a_star_grid`.
+    """
+    if isinstance(obstacles, np.ndarray):
+        occupancy = obstacles
+    else:
+        occupancy = occupancy_grid(obstacles, grid_size)
+    return a_star_grid(occupancy, (start.x, start.y), (goal.x, goal.y), mode, connectivity, cost_map, trace)
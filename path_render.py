@@ -0,0 +1,177 @@
+import io
+import struct
+import threading
+import zlib
+from collections import OrderedDict
+
+import numpy as np
+
+from path_planner import grid_fingerprint
+
+# Palette entries of the rendered PNG
+FREE, OBSTACLE, PATH, START, GOAL = range(5)
+PALETTE = bytes([
+    255, 255, 255,  # free
+    0, 0, 0,  # obstacle
+    0, 160, 0,  # path
+    0, 90, 255,  # start
+    255, 140, 0,  # goal
+])
+
+# Small grids are scaled up by whole pixels to at least this size
+MIN_PIXELS = 480
+
+
+def polyline_cells(points):
+    """Every (x, y) cell on the straight segments joining `points`, as an (n, 2) int array.
+
+    All segments are sampled in one pass with the same integer Bresenham
+    rounding the line-of-sight check uses, so cell-by-cell paths and
+    smoothed waypoint lists both come out as one connected line.
+    """
+    points = np.asarray(points, dtype=np.int64).reshape(-1, 2)
+    if len(points) < 2:
+        return points
+    deltas = np.diff(points, axis=0)
+    steps = np.maximum(np.abs(deltas).max(axis=1), 1)
+    segment = np.repeat(np.arange(len(deltas)), steps)
+    t = np.arange(int(steps.sum())) - np.repeat(np.cumsum(steps) - steps, steps)
+    n = steps[segment]
+    cells = points[segment] + (2 * deltas[segment] * t[:, None] + n[:, None]) // (2 * n[:, None])
+    return np.vstack([cells, points[-1:]])
+
+
+def grid_raster(occupancy):
+    """Palette-index image of an occupancy grid: rows run top to bottom with y pointing up."""
+    raster = np.where(occupancy != 0, OBSTACLE, FREE).astype(np.uint8)
+    return np.ascontiguousarray(raster.T[::-1])
+
+
+def draw_path(raster, path, start=None, goal=None):
+    """Copy of a `grid_raster` image with the path line and its end points painted on."""
+    image = raster.copy()
+    height = image.shape[0]
+    if path:
+        cells = polyline_cells(path)
+        image[height - 1 - cells[:, 1], cells[:, 0]] = PATH
+        start = path[0] if start is None else start
+        goal = path[-1] if goal is None else goal
+    for cell, colour in ((start, START), (goal, GOAL)):
+        if cell is not None:
+            image[height - 1 - cell[1], cell[0]] = colour
+    return image
+
+
+def encode_png(image, palette=PALETTE, level=6):
+    """Encode a 2-D uint8 palette-index image as PNG bytes."""
+    height, width = image.shape
+    # Each scanline starts with filter type 0 (none)
+    scanlines = np.zeros((height, width + 1), dtype=np.uint8)
+    scanlines[:, 1:] = image
+
+    def chunk(kind, data):
+        return struct.pack(">I", len(data)) + kind + data + struct.pack(">I", zlib.crc32(kind + data))
+
+    header = struct.pack(">IIBBBBB", width, height, 8, 3, 0, 0, 0)
+    return (b"\x89PNG\r\n\x1a\n" + chunk(b"IHDR", header) + chunk(b"PLTE", palette)
+            + chunk(b"IDAT", zlib.compress(scanlines.tobytes(), level)) + chunk(b"IEND", b""))
+
+
+def render_png(occupancy, path=None, start=None, goal=None, min_pixels=MIN_PIXELS):
+    """Occupancy grid plus path as PNG bytes, drawn straight from NumPy with no plotting library."""
+    image = draw_path(grid_raster(occupancy), path, start, goal)
+    scale = max(1, min_pixels // max(image.shape))
+    if scale > 1:
+        image = image.repeat(scale, axis=0).repeat(scale, axis=1)
+    return encode_png(image)
+
+
+class PathRenderer:
+    """Path plots for the dashboards, with the encoded PNG cached per map version and path.
+
+    Untitled plots are rasterized directly by `render_png`. Titled plots go
+    through one matplotlib figure that is kept and updated in place: the
+    grid is a single `imshow` and the path a single line, whatever the map
+    size. The figure is drawn by the Agg canvas without pyplot, so any
+    thread may render; pass `pyplot=True` for a figure that `plt.show()`
+    can display. Pass `version` when the caller already tracks map
+    versions; otherwise the grid is fingerprinted.
+    """
+    def __init__(self, capacity=64, figsize=(6, 6), pyplot=False):
+        self.capacity = capacity
+        self.figsize = figsize
+        self.pyplot = pyplot
+        self.hits = 0
+        self.misses = 0
+        self._images = OrderedDict()
+        self._lock = threading.Lock()
+        self._figure = None
+
+    def render(self, occupancy, path=None, title=None, version=None, start=None, goal=None):
+        """PNG bytes of the grid with `path` drawn on it."""
+        version = version or grid_fingerprint(occupancy)
+        path_key = np.asarray(path if path else [], dtype=np.int64).tobytes()
+        key = (version, path_key, title, start and tuple(start), goal and tuple(goal))
+        with self._lock:
+            png = self._images.get(key)
+            if png is not None:
+                self._images.move_to_end(key)
+                self.hits += 1
+                return png
+            self.misses += 1
+
+            if title is None:
+                png = render_png(occupancy, path, start, goal)
+            else:
+                figure = self.draw(occupancy, path, title, start, goal)
+                buf = io.BytesIO()
+                figure.savefig(buf, format="png")
+                png = buf.getvalue()
+            self._images[key] = png
+            if len(self._images) > self.capacity:
+                self._images.popitem(last=False)
+        return png
+
+    def draw(self, occupancy, path=None, title=None, start=None, goal=None):
+        """Draw onto the shared figure and return it, e.g. for `plt.show()` when made with `pyplot=True`."""
+        width, height = occupancy.shape
+        extent = (-0.5, width - 0.5, -0.5, height - 0.5)
+        grid = np.asarray(occupancy != 0, dtype=np.uint8).T
+        if self._figure is None:
+            if self.pyplot:
+                import matplotlib.pyplot as plt
+                figure = plt.figure(figsize=self.figsize)
+            else:
+                from matplotlib.backends.backend_agg import FigureCanvasAgg
+                from matplotlib.figure import Figure
+                figure = Figure(figsize=self.figsize)
+                FigureCanvasAgg(figure)
+            ax = figure.add_subplot()
+            self._grid = ax.imshow(grid, cmap="gray_r", vmin=0, vmax=1, origin="lower",
+                                   interpolation="nearest", extent=extent)
+            (self._line,) = ax.plot([], [], color="green", linewidth=2, label="Path")
+            (self._start,) = ax.plot([], [], "o", color="blue", markersize=8, label="Start")
+            (self._goal,) = ax.plot([], [], "o", color="orange", markersize=8, label="Goal")
+            ax.legend(loc="upper right")
+            self._figure, self._ax = figure, ax
+        else:
+            self._grid.set_data(grid)
+            self._grid.set_extent(extent)
+
+        if path:
+            xs, ys = zip(*path)
+            start = path[0] if start is None else start
+            goal = path[-1] if goal is None else goal
+        else:
+            xs, ys = (), ()
+        self._line.set_data(xs, ys)
+        self._start.set_data(*(([start[0]], [start[1]]) if start is not None else ([], [])))
+        self._goal.set_data(*(([goal[0]], [goal[1]]) if goal is not None else ([], [])))
+        self._ax.set_xlim(extent[0], extent[1])
+        self._ax.set_ylim(extent[2], extent[3])
+        self._ax.set_title(title or "")
+        return self._figure
+
+    def clear(self):
+        with self._lock:
+            self._images.clear()
@@ -0,0 +1,314 @@
+import threading
+import time
+from collections import deque
+
+
+class StreamStats:
+    """Frame counts of one camera stream since it was added."""
+    def __init__(self):
+        self.captured = 0
+        self.dropped = 0
+        self.inferred = 0
+        self.published = 0
+        self.started = time.perf_counter()
+
+    @property
+    def fps(self):
+        elapsed = time.perf_counter() - self.started
+        return self.published / elapsed if elapsed > 0 else 0.0
+
+    def __repr__(self):
+        return (f"StreamStats(captured={self.captured}, dropped={self.dropped}, inferred={self.inferred}, "
+                f"published={self.published}, fps={self.fps:.1f})")
+
+
+class Stream:
+    """One capture source and its buffered frames; `state` holds the caller's per-stream objects."""
+    def __init__(self, name, source, live, capture, buffer_size, gate=None):
+        self.name = name
+        self.source = source
+        self.live = live
+        self.capture = capture
+        self.buffer = deque()
+        self.buffer_size = buffer_size
+        self.gate = gate
+        self.state = {}
+        self.latest = None
+        self.finished = False
+        self.removed = False
+        self.error = None
+        self.busy = False
+        self.stats = StreamStats()
+        self.thread = None
+
+    def __repr__(self):
+        failed = "" if self.error is None else f", error={self.error!r}"
+        return f"Stream({self.name!r}, source={self.source!r}, live={self.live}, {self.stats}{failed})"
+
+
+def is_live_source(source):
+    """Webcam indices and network URLs are live; anything else is treated as a file."""
+    return isinstance(source, int) or str(source).startswith(("rtsp://", "rtmp://", "http://", "https://"))
+
+
+class StreamManager:
+    """Many camera streams sharing one pool of inference workers.
+
+    Every stream has its own capture thread filling a small buffer: live
+    sources drop their oldest frame when it is full, files wait. Workers
+    build each batch round-robin, one frame per stream per pass and
+    starting from a different stream every time, so a busy camera cannot
+    starve the others. A stream is held by one worker at a time, which
+    keeps its frames in order and lets `finish` use per-stream state such
+    as a tracker without locking.
+
+    `infer_factory()` is called once per worker to build that worker's
+    `infer(frames) -> results`, so each worker can load its own model.
+    `finish(stream, frame, result)` turns one result into the stream's
+    latest output; `result` is None when the stream's motion gate (from
+    `gate_factory`) judged the frame unchanged and inference was skipped.
+
+    An exception from one stream's capture, inference or `finish` ends
+    only that stream and is kept as its `error` (see `failed`); the others
+    keep running. Only a worker that cannot build its `infer` stops the
+    manager and is re-raised by `join`.
+    """
+    def __init__(self, infer_factory, finish, workers=2, batch_size=8, buffer_size=4, prepare=None,
+                 gate_factory=None, opener=None):
+        if workers < 1 or batch_size < 1:
+            raise ValueError(f"Need workers >= 1 and batch_size >= 1, got {workers} and {batch_size}")
+        self.infer_factory = infer_factory
+        self.finish = finish
+        self.workers = workers
+        self.batch_size = batch_size
+        self.buffer_size = buffer_size
+        self.prepare = prepare
+        self.gate_factory = gate_factory
+        self.opener = opener
+        self.error = None
+        self._streams = {}
+        self._cursor = 0
+        self._running = False
+        self._threads = []
+        self._condition = threading.Condition()
+
+    def add_stream(self, name, source, live=None):
+        """Open `source` (a webcam index, file path or stream URL) and start capturing it if running."""
+        if name in self._streams:
+            raise ValueError(f"Stream {name!r} already exists")
+        live = is_live_source(source) if live is None else live
+        gate = self.gate_factory() if self.gate_factory else None
+        stream = Stream(name, source, live, self._open(source), self.buffer_size, gate)
+        with self._condition:
+            self._streams[name] = stream
+        if self._running:
+            self._start_capture(stream)
+        return stream
+
+    def remove_stream(self, name):
+        with self._condition:
+            stream = self._streams.pop(name)
+            stream.removed = True
+            self._condition.notify_all()
+        if stream.thread is not None:
+            stream.thread.join()
+
+    def start(self):
+        if self._running:
+            return
+        self._running = True
+        self.error = None
+        for stream in list(self._streams.values()):
+            self._start_capture(stream)
+        self._threads = [threading.Thread(target=self._work, daemon=True) for _ in range(self.workers)]
+        for thread in self._threads:
+            thread.start()
+
+    def stop(self):
+        with self._condition:
+            self._running = False
+            self._condition.notify_all()
+        for thread in self._threads:
+            thread.join()
+        for stream in list(self._streams.values()):
+            if stream.thread is not None:
+                stream.thread.join()
+                stream.thread = None
+        self._threads = []
+
+    def join(self, timeout=None):
+        """Wait until every stream has ended or failed and been fully processed, then stop. False on timeout."""
+        deadline = None if timeout is None else time.perf_counter() + timeout
+        with self._condition:
+            while self._running and self.error is None and not self._drained():
+                remaining = None if deadline is None else deadline - time.perf_counter()
+                if remaining is not None and remaining <= 0:
+                    return False
+                self._condition.wait(0.1 if remaining is None else min(remaining, 0.1))
+        self.stop()
+        if self.error is not None:
+            raise self.error
+        return True
+
+    def latest(self, name):
+        """The newest output of stream `name`, or None before its first frame."""
+        stream = self._streams.get(name)
+        return stream.latest if stream else None
+
+    def names(self):
+        return list(self._streams)
+
+    def stats(self):
+        return {name: stream.stats for name, stream in self._streams.items()}
+
+    def failed(self):
+        """The error that ended each failed stream, by name."""
+        return {name: stream.error for name, stream in self._streams.items() if stream.error is not None}
+
+    def _open(self, source):
+        if self.opener is not None:
+            return self.opener(source)
+        import cv2
+        return cv2.VideoCapture(source)
+
+    def _drained(self):
+        return all((stream.error is not None or stream.finished and not stream.buffer) and not stream.busy
+                   for stream in self._streams.values())
+
+    def _start_capture(self, stream):
+        stream.thread = threading.Thread(target=self._capture, args=(stream,), daemon=True)
+        stream.thread.start()
+
+    def _fail(self, error):
+        with self._condition:
+            self.error = error
+            self._running = False
+            self._condition.notify_all()
+
+    def _fail_stream(self, stream, error):
+        with self._condition:
+            stream.error = error
+            stream.buffer.clear()
+            self._condition.notify_all()
+
+    def _capture(self, stream):
+        sequence = 0
+        try:
+            while self._running and not stream.removed and stream.error is None:
+                ok, frame = stream.capture.read()
+                if not ok:
+                    break
+                if self.prepare is not None:
+                    frame = self.prepare(frame)
+                needs_inference = stream.gate.check(frame) if stream.gate is not None else True
+
+                with self._condition:
+                    while (not stream.live and len(stream.buffer) >= stream.buffer_size
+                           and self._running and not stream.removed):
+                        self._condition.wait(0.1)
+                    if len(stream.buffer) >= stream.buffer_size:
+                        # Latest wins; a dropped frame's trigger passes to the next so changes are never missed
+                        _, _, dropped_trigger = stream.buffer.popleft()
+                        needs_inference = needs_inference or dropped_trigger
+                        stream.stats.dropped += 1
+                    stream.buffer.append((sequence, frame, needs_inference))
+                    stream.stats.captured += 1
+                    self._condition.notify_all()
+                sequence += 1
+        except Exception as e:
+            self._fail_stream(stream, e)
+        finally:
+            stream.capture.release()
+            with self._condition:
+                stream.finished = True
+                self._condition.notify_all()
+
+    def _gather(self):
+        """Take up to `batch_size` frames round-robin from streams no other worker holds."""
+        streams = list(self._streams.values())
+        if not streams:
+            return []
+        start = self._cursor % len(streams)
+        self._cursor += 1
+        order = streams[start:] + streams[:start]
+
+        batch, taken = [], []
+        progress = True
+        while progress and len(batch) < self.batch_size:
+            progress = False
+            for stream in order:
+                if len(batch) >= self.batch_size:
+                    break
+                if not stream.buffer or stream.error is not None or (stream.busy and stream not in taken):
+                    continue
+                if stream not in taken:
+                    stream.busy = True
+                    taken.append(stream)
+                sequence, frame, needs_inference = stream.buffer.popleft()
+                batch.append((stream, frame, needs_inference))
+                progress = True
+        return batch
+
+    @staticmethod
+    def _infer_entries(infer, entries):
+        fresh = [frame for _, frame, needs_inference in entries if needs_inference]
+        results = iter(infer(fresh) if fresh else ())
+        return [(stream, frame, next(results) if needs_inference else None) for stream, frame, needs_inference in entries]
+
+    def _infer(self, infer, batch):
+        """(stream, frame, result) per batch entry, result None where the gate skipped inference.
+
+        When the batch fails and holds several streams, each stream's frames
+        are retried on their own, so only the streams that still fail end.
+        """
+        try:
+            return self._infer_entries(infer, batch)
+        except Exception as e:
+            error = e
+        streams = list({id(stream): stream for stream, _, _ in batch}.values())
+        if len(streams) == 1:
+            self._fail_stream(streams[0], error)
+            return []
+        outputs = []
+        for stream in streams:
+            try:
+                outputs += self._infer_entries(infer, [entry for entry in batch if entry[0] is stream])
+            except Exception as e:
+                self._fail_stream(stream, e)
+        return outputs
+
+    def _work(self):
+        infer = None
+        while True:
+            with self._condition:
+                if self.error is not None:
+                    return
+                batch = self._gather()
+                while not batch and self._running:
+                    self._condition.wait(0.1)
+                    batch = self._gather()
+                if not batch:
+                    return
+                # Capture threads of files may be waiting for buffer space
+                self._condition.notify_all()
+
+            try:
+                if infer is None:
+                    infer = self.infer_factory()
+                for stream, frame, result in self._infer(infer, batch):
+                    if stream.error is not None:
+                        continue
+                    try:
+                        stream.latest = self.finish(stream, frame, result)
+                    except Exception as e:
+                        self._fail_stream(stream, e)
+                        continue
+                    stream.stats.inferred += result is not None
+                    stream.stats.published += 1
+            except Exception as e:
+                self._fail(e)
+            finally:
+                with self._condition:
+                    for stream in {id(stream): stream for stream, _, _ in batch}.values():
+                        stream.busy = False
+                    self._condition.notify_all()
@@ -0,0 +1,202 @@
+import numpy as np
+
+# Constant-velocity model over [cx, cy, area, aspect, vx, vy, v_area], as in SORT
+STATE_SIZE = 7
+TRANSITION = np.eye(STATE_SIZE)
+TRANSITION[0, 4] = TRANSITION[1, 5] = TRANSITION[2, 6] = 1
+MEASUREMENT = np.eye(4, STATE_SIZE)
+MEASUREMENT_NOISE = np.diag([1.0, 1.0, 10.0, 10.0])
+PROCESS_NOISE = np.diag([1.0, 1.0, 1.0, 1.0, 0.01, 0.01, 0.0001])
+INITIAL_COVARIANCE = np.diag([10.0, 10.0, 10.0, 10.0, 10000.0, 10000.0, 10000.0])
+
+
+def iou_matrix(boxes_a, boxes_b):
+    """Pairwise intersection-over-union of two (n, 4) and (m, 4) arrays of x1, y1, x2, y2 boxes."""
+    a = np.asarray(boxes_a, dtype=np.float64).reshape(-1, 4)[:, None, :]
+    b = np.asarray(boxes_b, dtype=np.float64).reshape(-1, 4)[None, :, :]
+    width = np.clip(np.minimum(a[..., 2], b[..., 2]) - np.maximum(a[..., 0], b[..., 0]), 0, None)
+    height = np.clip(np.minimum(a[..., 3], b[..., 3]) - np.maximum(a[..., 1], b[..., 1]), 0, None)
+    overlap = width * height
+    area_a = (a[..., 2] - a[..., 0]) * (a[..., 3] - a[..., 1])
+    area_b = (b[..., 2] - b[..., 0]) * (b[..., 3] - b[..., 1])
+    union = area_a + area_b - overlap
+    return np.divide(overlap, union, out=np.zeros_like(overlap), where=union > 0)
+
+
+def linear_assignment(cost):
+    """Minimum-cost matching of a rectangular cost matrix, as (rows, cols) index arrays.
+
+    The Hungarian method in its shortest augmenting path form: one row is
+    added at a time and the column scan of each step is vectorized, so it
+    needs O(n^2 m) arithmetic but only O(n^2) Python steps.
+    """
+    cost = np.asarray(cost, dtype=np.float64)
+    transposed = cost.shape[0] > cost.shape[1]
+    if transposed:
+        cost = cost.T
+    rows, cols = cost.shape
+    if not rows:
+        return np.zeros(0, dtype=np.int64), np.zeros(0, dtype=np.int64)
+
+    # 1-based as in the textbook form: column 0 is the virtual start, owner[j] == 0 means free
+    row_potential = np.zeros(rows + 1)
+    col_potential = np.zeros(cols + 1)
+    owner = np.zeros(cols + 1, dtype=np.int64)
+    way = np.zeros(cols + 1, dtype=np.int64)
+    for row in range(1, rows + 1):
+        owner[0] = row
+        column = 0
+        slack = np.full(cols + 1, np.inf)
+        used = np.zeros(cols + 1, dtype=bool)
+        while True:
+            used[column] = True
+            reduced = cost[owner[column] - 1] - row_potential[owner[column]] - col_potential[1:]
+            free = ~used[1:]
+            better = free & (reduced < slack[1:])
+            slack[1:][better] = reduced[better]
+            way[1:][better] = column
+            candidates = np.where(free, slack[1:], np.inf)
+            next_column = int(np.argmin(candidates)) + 1
+            delta = candidates[next_column - 1]
+            row_potential[owner[used]] += delta
+            col_potential[used] -= delta
+            slack[~used] -= delta
+            column = next_column
+            if owner[column] == 0:
+                break
+        while column:
+            previous = way[column]
+            owner[column] = owner[previous]
+            column = previous
+
+    matched = np.flatnonzero(owner[1:])
+    row_index, col_index = owner[1:][matched] - 1, matched
+    if transposed:
+        row_index, col_index = col_index, row_index
+    order = np.argsort(row_index)
+    return row_index[order], col_index[order]
+
+
+def boxes_to_measurements(boxes):
+    """(n, 4) x1, y1, x2, y2 boxes as (n, 4) centre x, centre y, area, aspect ratio."""
+    boxes = np.asarray(boxes, dtype=np.float64).reshape(-1, 4)
+    width = boxes[:, 2] - boxes[:, 0]
+    height = boxes[:, 3] - boxes[:, 1]
+    return np.column_stack([boxes[:, 0] + width / 2, boxes[:, 1] + height / 2, width * height,
+                            width / np.maximum(height, 1e-9)])
+
+
+def states_to_boxes(states):
+    """Kalman states back to (n, 4) x1, y1, x2, y2 boxes."""
+    area = np.maximum(states[:, 2], 0)
+    width = np.sqrt(area * np.maximum(states[:, 3], 0))
+    height = np.divide(area, width, out=np.zeros_like(area), where=width > 0)
+    return np.column_stack([states[:, 0] - width / 2, states[:, 1] - height / 2,
+                            states[:, 0] + width / 2, states[:, 1] + height / 2])
+
+
+class Tracker:
+    """SORT-style multi-object tracker: Kalman-predicted boxes matched to detections by IoU.
+
+    All track states live in stacked arrays, so prediction and the Kalman
+    update are a few batched NumPy operations per frame. A track is
+    confirmed after `min_hits` matched detections and dropped after
+    `max_age` detector frames without one; only confirmed tracks are
+    reported and counted, which filters one-frame false positives. `counts`
+    maps each class id to the number of tracks confirmed with it; a track
+    is counted once, when first confirmed, so an intruder standing still
+    is counted once however many frames show them and memory stays bounded
+    on an endless stream.
+    """
+    def __init__(self, max_age=15, min_hits=3, iou_threshold=0.3):
+        self.max_age = max_age
+        self.min_hits = min_hits
+        self.iou_threshold = iou_threshold
+        self.states = np.zeros((0, STATE_SIZE))
+        self.covariances = np.zeros((0, STATE_SIZE, STATE_SIZE))
+        self.ids = np.zeros(0, dtype=np.int64)
+        self.classes = np.zeros(0, dtype=np.int64)
+        self.hits = np.zeros(0, dtype=np.int64)
+        self.misses = np.zeros(0, dtype=np.int64)
+        self.counted = np.zeros(0, dtype=bool)
+        self.counts = {}
+        self._next_id = 1
+
+    def predict(self):
+        """Advance every track one frame and return the predicted (n, 4) boxes."""
+        # An area about to go negative stops shrinking instead
+        self.states[self.states[:, 2] + self.states[:, 6] <= 0, 6] = 0
+        self.states = self.states @ TRANSITION.T
+        self.covariances = TRANSITION @ self.covariances @ TRANSITION.T + PROCESS_NOISE
+        return states_to_boxes(self.states)
+
+    def update(self, boxes, classes=None):
+        """Feed one frame's detections; returns (ids, boxes, classes) of the confirmed tracks they matched.
+
+        `boxes` is (n, 4) x1, y1, x2, y2 and `classes` an optional length-n
+        array of class ids. Call once per detector frame, with an empty
+        array when nothing was detected.
+        """
+        boxes = np.asarray(boxes, dtype=np.float64).reshape(-1, 4)
+        classes = np.zeros(len(boxes), dtype=np.int64) if classes is None else np.asarray(classes, dtype=np.int64)
+        predicted = self.predict()
+
+        overlap = iou_matrix(boxes, predicted)
+        if overlap.size:
+            detection_index, track_index = linear_assignment(-overlap)
+            keep = overlap[detection_index, track_index] >= self.iou_threshold
+            detection_index, track_index = detection_index[keep], track_index[keep]
+        else:
+            detection_index = track_index = np.zeros(0, dtype=np.int64)
+
+        self._correct(track_index, boxes_to_measurements(boxes[detection_index]))
+        self.classes[track_index] = classes[detection_index]
+        self.hits[track_index] += 1
+        self.misses += 1
+        self.misses[track_index] = 0
+
+        unmatched = np.ones(len(boxes), dtype=bool)
+        unmatched[detection_index] = False
+        self._spawn(boxes[unmatched], classes[unmatched])
+
+        alive = self.misses <= self.max_age
+        for name in ("states", "covariances", "ids", "classes", "hits", "misses", "counted"):
+            setattr(self, name, getattr(self, name)[alive])
+
+        confirmed = (self.misses == 0) & (self.hits >= self.min_hits)
+        first = confirmed & ~self.counted
+        for class_id in self.classes[first].tolist():
+            self.counts[class_id] = self.counts.get(class_id, 0) + 1
+        self.counted |= first
+        return self.ids[confirmed], states_to_boxes(self.states[confirmed]), self.classes[confirmed]
+
+    def unique_count(self, class_id):
+        """Number of distinct tracks confirmed with `class_id`."""
+        return self.counts.get(class_id, 0)
+
+    def _correct(self, track_index, measurements):
+        if not len(track_index):
+            return
+        states = self.states[track_index]
+        covariances = self.covariances[track_index]
+        residual = measurements - states @ MEASUREMENT.T
+        innovation = MEASUREMENT @ covariances @ MEASUREMENT.T + MEASUREMENT_NOISE
+        # K = P H^T S^-1, solved rather than inverted; S is symmetric
+        gain = np.linalg.solve(innovation, MEASUREMENT @ covariances).transpose(0, 2, 1)
+        self.states[track_index] = states + np.einsum("nij,nj->ni", gain, residual)
+        self.covariances[track_index] = (np.eye(STATE_SIZE) - gain @ MEASUREMENT) @ covariances
+
+    def _spawn(self, boxes, classes):
+        count = len(boxes)
+        if not count:
+            return
+        states = np.zeros((count, STATE_SIZE))
+        states[:, :4] = boxes_to_measurements(boxes)
+        self.states = np.vstack([self.states, states])
+        self.covariances = np.concatenate([self.covariances, np.repeat(INITIAL_COVARIANCE[None], count, axis=0)])
+        self.ids = np.concatenate([self.ids, np.arange(self._next_id, self._next_id + count)])
+        self.classes = np.concatenate([self.classes, classes])
+        self.hits = np.concatenate([self.hits, np.ones(count, dtype=np.int64)])
+        self.misses = np.concatenate([self.misses, np.zeros(count, dtype=np.int64)])
+        self.counted = np.concatenate([self.counted, np.zeros(count, dtype=bool)])
+        self._next_id += count
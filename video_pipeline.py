@@ -0,0 +1,217 @@
+import queue
+import threading
+import time
+
+# Marks the end of the stream in a stage queue
+_DONE = object()
+
+
+class PipelineStats:
+    """Frame counts and per-stage busy time of one pipeline run."""
+    def __init__(self):
+        self.captured = 0
+        self.dropped = 0
+        self.inferred = 0
+        self.batches = 0
+        self.published = 0
+        self.stale = 0
+        self.busy = {"capture": 0.0, "infer": 0.0, "encode": 0.0}
+        self.wall_time = 0.0
+
+    @property
+    def fps(self):
+        return self.published / self.wall_time if self.wall_time else 0.0
+
+    def __repr__(self):
+        busy = ", ".join(f"{stage}={seconds:.2f}s" for stage, seconds in self.busy.items())
+        return (f"PipelineStats(captured={self.captured}, dropped={self.dropped}, inferred={self.inferred}, "
+                f"batches={self.batches}, published={self.published}, stale={self.stale}, fps={self.fps:.1f}, busy: {busy})")
+
+
+class FramePipeline:
+    """Capture, inference and encoding on their own threads, joined by bounded queues.
+
+    `capture()` returns `(ok, frame)` like `cv2.VideoCapture.read`,
+    `infer(frame)` runs the detector and `encode(result)` turns its result
+    into what `publish(output)` hands to the dashboard. One thread captures,
+    one runs inference (models are not shared between threads) and
+    `encode_workers` threads encode, so throughput is set by the slowest
+    stage rather than the sum of all of them.
+
+    With `live=True` a full queue drops its oldest frame (latest wins) so a
+    camera never waits for the detector, and outputs older than one already
+    published are skipped. Otherwise every frame is processed: a full
+    queue blocks the stage feeding it, and outputs are published in frame
+    order.
+
+    With a `batch_size`, `infer` takes a list of frames and returns their
+    results in order, so the model runs once per batch. Batching is for
+    offline input only: waiting to fill a batch would add latency to a live
+    feed.
+    """
+    def __init__(self, capture, infer, encode, publish, live=False, queue_size=4, encode_workers=2,
+                 stop_event=None, batch_size=None):
+        if encode_workers < 1:
+            raise ValueError(f"encode_workers must be at least 1, got {encode_workers}")
+        if batch_size is not None and batch_size < 1:
+            raise ValueError(f"batch_size must be at least 1, got {batch_size}")
+        if live and batch_size is not None:
+            raise ValueError("Live input is inferred frame by frame; batch_size is for offline input")
+        self.capture = capture
+        self.infer = infer
+        self.encode = encode
+        self.publish = publish
+        self.live = live
+        self.encode_workers = encode_workers
+        self.batch_size = batch_size
+        self.stop_event = stop_event or threading.Event()
+        self.stats = PipelineStats()
+        self.error = None
+        self._failed = threading.Event()
+        # The frame queue holds at least one full batch so capture keeps running while it fills
+        self._frames = queue.Queue(max(queue_size, batch_size or 0))
+        self._results = queue.Queue(queue_size)
+        self._lock = threading.Lock()
+        self._pending = {}
+        self._next = 0
+
+    def run(self):
+        """Process the stream until capture ends or `stop_event` is set; returns the stats."""
+        started = time.perf_counter()
+        threads = [threading.Thread(target=self._guard, args=(self._capture_loop,), daemon=True),
+                   threading.Thread(target=self._guard, args=(self._infer_loop,), daemon=True)]
+        threads += [threading.Thread(target=self._guard, args=(self._encode_loop,), daemon=True)
+                    for _ in range(self.encode_workers)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.stats.wall_time = time.perf_counter() - started
+        if self.error is not None:
+            raise self.error
+        return self.stats
+
+    def _stopped(self):
+        return self.stop_event.is_set() or self._failed.is_set()
+
+    def _guard(self, loop):
+        # A failing stage stops the others instead of leaving them blocked on its queue
+        try:
+            loop()
+        except Exception as e:
+            self.error = e
+            self._failed.set()
+
+    def _put(self, stage_queue, item):
+        """Hand an item to the next stage; False if the pipeline stopped first."""
+        while not self._stopped():
+            try:
+                if self.live:
+                    stage_queue.put_nowait(item)
+                else:
+                    stage_queue.put(item, timeout=0.1)
+                return True
+            except queue.Full:
+                if not self.live:
+                    continue
+            try:
+                stage_queue.get_nowait()
+                with self._lock:
+                    self.stats.dropped += 1
+            except queue.Empty:
+                pass
+        return False
+
+    def _close(self, stage_queue):
+        # End markers are never dropped, or a consumer would wait forever
+        while not self._stopped():
+            try:
+                stage_queue.put(_DONE, timeout=0.1)
+                return
+            except queue.Full:
+                continue
+
+    def _get(self, stage_queue):
+        while not self._stopped():
+            try:
+                return stage_queue.get(timeout=0.1)
+            except queue.Empty:
+                continue
+        return _DONE
+
+    def _capture_loop(self):
+        sequence = 0
+        while not self._stopped():
+            started = time.perf_counter()
+            ok, frame = self.capture()
+            self.stats.busy["capture"] += time.perf_counter() - started
+            if not ok:
+                break
+            self.stats.captured += 1
+            if not self._put(self._frames, (sequence, frame)):
+                break
+            sequence += 1
+        self._close(self._frames)
+
+    def _next_batch(self):
+        """(items, done): up to `batch_size` captured frames, and whether the stream has ended."""
+        item = self._get(self._frames)
+        if item is _DONE:
+            return [], True
+        batch = [item]
+        while len(batch) < (self.batch_size or 1):
+            item = self._get(self._frames)
+            if item is _DONE:
+                return batch, True
+            batch.append(item)
+        return batch, False
+
+    def _infer_loop(self):
+        done = False
+        while not done:
+            batch, done = self._next_batch()
+            if not batch:
+                break
+            frames = [frame for _, frame in batch]
+            started = time.perf_counter()
+            results = self.infer(frames) if self.batch_size else [self.infer(frames[0])]
+            self.stats.busy["infer"] += time.perf_counter() - started
+            if len(results) != len(batch):
+                raise ValueError(f"infer returned {len(results)} results for a batch of {len(batch)} frames")
+            self.stats.inferred += len(batch)
+            self.stats.batches += 1
+            for (sequence, _), result in zip(batch, results):
+                if not self._put(self._results, (sequence, result)):
+                    done = True
+                    break
+        for _ in range(self.encode_workers):
+            self._close(self._results)
+
+    def _encode_loop(self):
+        while True:
+            item = self._get(self._results)
+            if item is _DONE:
+                break
+            sequence, result = item
+            started = time.perf_counter()
+            output = self.encode(result)
+            elapsed = time.perf_counter() - started
+            with self._lock:
+                self.stats.busy["encode"] += elapsed
+                self._deliver(sequence, output)
+
+    def _deliver(self, sequence, output):
+        """Publish in frame order; called with the lock held."""
+        if self.live:
+            if sequence < self._next:
+                self.stats.stale += 1
+                return
+            self._next = sequence + 1
+            self.publish(output)
+            self.stats.published += 1
+            return
+        self._pending[sequence] = output
+        while self._next in self._pending:
+            self.publish(self._pending.pop(self._next))
+            self.stats.published += 1
+            self._next += 1